@@ -5,6 +5,7 @@ This module provides configuration management for the security scanning system,
 including tool-specific settings, thresholds, and integration parameters.
 """
 
+import functools
 import os
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -170,8 +171,9 @@ class SecuritySettings(BaseSettings):
         case_sensitive = False
 
 
+@functools.lru_cache(maxsize=1)
 def get_security_config() -> SecuritySettings:
-    """Get security configuration with environment overrides."""
+    """Get security configuration with environment overrides (cached singleton)."""
     return SecuritySettings()
 
 
@@ -72,8 +72,9 @@ CREATE TABLE IF NOT EXISTS content_items (
     topics TEXT[],
     language VARCHAR(10) DEFAULT 'en',
     metadata JSONB,
-    embedding vector(1536), -- OpenAI embedding dimension
+    embedding BYTEA, -- OpenAI embedding, 1536 packed float16 values
     status VARCHAR(20) DEFAULT 'pending' CHECK (status IN ('pending', 'approved', 'rejected', 'processing')),
+    last_metadata_refresh_at TIMESTAMP WITH TIME ZONE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -85,9 +86,7 @@ CREATE INDEX IF NOT EXISTS idx_content_items_source ON content_items(source);
 CREATE INDEX IF NOT EXISTS idx_content_items_difficulty ON content_items(difficulty_level);
 CREATE INDEX IF NOT EXISTS idx_content_items_topics ON content_items USING GIN(topics);
 CREATE INDEX IF NOT EXISTS idx_content_items_language ON content_items(language);
-
--- Create vector similarity index (will be created after embeddings are added)
--- CREATE INDEX content_embedding_idx ON content_items USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
+CREATE INDEX IF NOT EXISTS idx_content_items_metadata_refresh ON content_items(source, last_metadata_refresh_at);
 
 -- User interactions table
 CREATE TABLE IF NOT EXISTS user_interactions (
@@ -8,8 +8,11 @@ Purpose: Configure Celery for background content processing tasks
 """
 
 from celery import Celery
+from celery.signals import worker_process_init
+from kombu import Queue
 import structlog
 from config.settings import get_settings
+from services.database import engine
 
 logger = structlog.get_logger()
 settings = get_settings()
@@ -37,12 +40,35 @@ celery_app.conf.update(
     task_soft_time_limit=25 * 60,  # 25 minutes
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=1000,
+    worker_max_memory_per_child=2_000_000,  # KiB; recycle children whose RSS grows past ~2 GB
+)
+
+# Task queues; a worker started without -Q consumes all of them, while dedicated
+# workers can be started per queue (e.g. -Q embeddings with low concurrency)
+celery_app.conf.task_default_queue = "content"
+celery_app.conf.task_queues = (
+    Queue("content"),
+    Queue("embeddings"),
+    Queue("maintenance"),
+    Queue("recommendations"),
 )
 
 # Task routing
 celery_app.conf.task_routes = {
+    # Embedding generation is model-bound; keep it on its own queue so it scales separately
+    "services.tasks.content_tasks.process_content_embedding": {"queue": "embeddings"},
+    "services.tasks.content_tasks.batch_process_content_embeddings": {"queue": "embeddings"},
+    # Light filesystem cleanup must not wait behind long embedding or metadata batches
+    "services.tasks.content_tasks.cleanup_failed_uploads": {"queue": "maintenance"},
     "services.tasks.content_tasks.*": {"queue": "content"},
     "services.tasks.recommendation_tasks.*": {"queue": "recommendations"},
 }
 
+@worker_process_init.connect
+def reset_worker_db_pool(**kwargs):
+    """Give each forked worker process its own database connection pool"""
+    # Connections inherited from the parent must not be shared across processes
+    engine.dispose(close=False)
+    logger.info("Worker database pool initialized")
+
 # Updated 2025-09-05: Celery application configuration for background tasks
\ No newline at end of file
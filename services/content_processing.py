@@ -7,12 +7,47 @@ Created: 2025-09-09
 Purpose: Content processing, validation, and enrichment service
 """
 
+import math
+import re
+import httpx
 import structlog
+import xml.etree.ElementTree as ET
 from typing import Dict, List, Any, Optional
+from config.settings import get_settings
 from services.models import ContentItem
+from services.ai_client import get_ai_client
+from services.exceptions import ContentProcessingError, ExternalServiceError
 
 logger = structlog.get_logger()
 
+# Source metadata APIs
+YOUTUBE_VIDEOS_API_URL = "https://www.googleapis.com/youtube/v3/videos"
+EXTERNAL_API_TIMEOUT_SECONDS = 10.0
+ATOM_NAMESPACE = {"atom": "http://www.w3.org/2005/Atom"}
+
+YOUTUBE_ID_PATTERN = re.compile(r"(?:youtube\.com/(?:watch\?(?:.*&)?v=|embed/|shorts/)|youtu\.be/)([\w-]+)")
+YOUTUBE_DURATION_PATTERN = re.compile(r"P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?")
+
+# Keywords in free text that map to content topics
+TOPIC_KEYWORDS = {
+    "AI": ("artificial intelligence", " ai "),
+    "Machine Learning": ("machine learning", "deep learning", "neural network"),
+    "Programming": ("programming", "python", "javascript", "software"),
+    "Data Science": ("data science", "statistics", "data analysis"),
+    "Web Development": ("web development", "frontend", "backend")
+}
+
+# arXiv categories with a matching content topic
+ARXIV_CATEGORY_TOPICS = {
+    "cs.AI": "AI",
+    "cs.LG": "Machine Learning",
+    "stat.ML": "Machine Learning",
+    "cs.CL": "Natural Language Processing",
+    "cs.CV": "Computer Vision",
+    "cs.SE": "Programming",
+    "cs.DB": "Data Science"
+}
+
 class ContentProcessor:
     """Content processing service"""
     
@@ -66,4 +101,161 @@ class ContentProcessor:
             return content
         except Exception as e:
             logger.error("Content processing failed", error=str(e), content_id=str(content.id))
-            return content
\ No newline at end of file
+            return content
+    
+    def extract_youtube_id(self, url: str) -> Optional[str]:
+        """Extract the video ID from a YouTube watch, short, or embed URL"""
+        match = YOUTUBE_ID_PATTERN.search(url)
+        return match.group(1) if match else None
+    
+    def _parse_youtube_duration(self, duration: str) -> int:
+        """Convert an ISO 8601 duration such as PT15M33S to whole minutes, rounding up"""
+        match = YOUTUBE_DURATION_PATTERN.fullmatch(duration or "")
+        if not match:
+            return 0
+        days, hours, minutes, seconds = (int(part or 0) for part in match.groups())
+        return math.ceil((((days * 24 + hours) * 60 + minutes) * 60 + seconds) / 60)
+    
+    def _extract_topics_from_content(self, content: str) -> List[str]:
+        """Derive topics from keywords in free text"""
+        text = f" {content.lower()} "
+        topics = [topic for topic, keywords in TOPIC_KEYWORDS.items() if any(k in text for k in keywords)]
+        return topics or ["General"]
+    
+    def _map_arxiv_categories(self, categories: List[str]) -> List[str]:
+        """Map arXiv category terms to content topics"""
+        topics = [
+            ARXIV_CATEGORY_TOPICS.get(category, category.replace(".", " ").title())
+            for category in categories
+        ]
+        return list(dict.fromkeys(topics + ["Research", "Academic"]))
+    
+    async def _get(self, url: str, params: Dict[str, str]) -> httpx.Response:
+        """GET an external API, surfacing transport and status failures as ExternalServiceError"""
+        try:
+            async with httpx.AsyncClient(timeout=EXTERNAL_API_TIMEOUT_SECONDS) as client:
+                response = await client.get(url, params=params)
+                response.raise_for_status()
+                return response
+        except httpx.HTTPError as e:
+            raise ExternalServiceError(f"Request to {url} failed: {str(e)}")
+    
+    async def fetch_youtube_metadata(self, url: str) -> Dict[str, Any]:
+        """Fetch content fields for a YouTube video, without an embedding"""
+        video_id = self.extract_youtube_id(url)
+        if not video_id:
+            raise ContentProcessingError(f"Invalid YouTube URL: {url}")
+        
+        params = {"id": video_id, "part": "snippet,contentDetails,statistics"}
+        api_key = get_settings().YOUTUBE_API_KEY
+        if api_key:
+            params["key"] = api_key
+        
+        items = (await self._get(YOUTUBE_VIDEOS_API_URL, params)).json().get("items")
+        if not items:
+            raise ContentProcessingError(f"Video not found: {video_id}")
+        
+        snippet = items[0].get("snippet", {})
+        statistics = items[0].get("statistics", {})
+        title = snippet.get("title", "")
+        description = snippet.get("description", "")
+        tags = snippet.get("tags", [])
+        
+        return {
+            "title": title,
+            "description": description,
+            "content_type": "video",
+            "source": "youtube",
+            "source_id": video_id,
+            "url": url,
+            "duration_minutes": self._parse_youtube_duration(items[0].get("contentDetails", {}).get("duration")),
+            "topics": self._extract_topics_from_content(" ".join([title, description, *tags])),
+            "language": snippet.get("defaultLanguage", "en"),
+            "metadata": {
+                "channel_title": snippet.get("channelTitle"),
+                "published_at": snippet.get("publishedAt"),
+                "tags": tags,
+                "view_count": int(statistics.get("viewCount", 0)),
+                "like_count": int(statistics.get("likeCount", 0))
+            }
+        }
+    
+    async def fetch_arxiv_metadata(self, arxiv_id: str) -> Dict[str, Any]:
+        """Fetch content fields for an arXiv paper, without an embedding"""
+        response = await self._get(get_settings().ARXIV_API_BASE_URL, {"id_list": arxiv_id})
+        
+        try:
+            entry = ET.fromstring(response.content).find("atom:entry", ATOM_NAMESPACE)
+        except ET.ParseError as e:
+            raise ContentProcessingError(f"Invalid arXiv response: {str(e)}")
+        if entry is None or entry.find("atom:title", ATOM_NAMESPACE) is None:
+            raise ContentProcessingError(f"Paper not found: {arxiv_id}")
+        
+        def text(path: str) -> str:
+            return " ".join(entry.findtext(path, "", ATOM_NAMESPACE).split())
+        
+        categories = [category.get("term") for category in entry.findall("atom:category", ATOM_NAMESPACE)]
+        pdf_url = next((
+            link.get("href") for link in entry.findall("atom:link", ATOM_NAMESPACE)
+            if link.get("type") == "application/pdf"
+        ), f"https://arxiv.org/pdf/{arxiv_id}.pdf")
+        
+        return {
+            "title": text("atom:title"),
+            "description": text("atom:summary"),
+            "content_type": "paper",
+            "source": "arxiv",
+            "source_id": arxiv_id,
+            "url": f"https://arxiv.org/abs/{arxiv_id}",
+            "duration_minutes": None,
+            "topics": self._map_arxiv_categories(categories),
+            "language": "en",
+            "metadata": {
+                "authors": [name.text for name in entry.findall("atom:author/atom:name", ATOM_NAMESPACE)],
+                "categories": categories,
+                "published_at": text("atom:published") or None,
+                "pdf_url": pdf_url
+            }
+        }
+    
+    async def process_youtube_content(self, url: str) -> Dict[str, Any]:
+        """Fetch a YouTube video and embed its title and description"""
+        content_data = await self.fetch_youtube_metadata(url)
+        content_data["embedding"] = await self.generate_embedding(
+            f"{content_data['title']} {content_data['description']}"
+        )
+        return content_data
+    
+    async def process_arxiv_content(self, arxiv_id: str) -> Dict[str, Any]:
+        """Fetch an arXiv paper and embed its title and abstract"""
+        content_data = await self.fetch_arxiv_metadata(arxiv_id)
+        content_data["embedding"] = await self.generate_embedding(
+            f"{content_data['title']} {content_data['description']}"
+        )
+        return content_data
+    
+    async def generate_embedding(self, text: str) -> List[float]:
+        """Generate embedding vector for content text"""
+        try:
+            return await get_ai_client().generate_embedding(text)
+        except Exception as e:
+            raise ContentProcessingError(f"Embedding generation failed: {str(e)}")
+    
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Generate embedding vectors for several texts in one model call, embedding repeated texts once"""
+        unique_texts = list(dict.fromkeys(texts))
+        embeddings = await get_ai_client().generate_multiple_embeddings(unique_texts)
+        if len(embeddings) != len(unique_texts):
+            raise ContentProcessingError(
+                f"Expected {len(unique_texts)} embeddings, got {len(embeddings)}"
+            )
+        
+        if len(unique_texts) == len(texts):
+            return embeddings
+        
+        # Scatter each unique embedding back to every position its text appeared in
+        embeddings_by_text = dict(zip(unique_texts, embeddings))
+        return [embeddings_by_text[text] for text in texts]
+
+# Global content processor instance
+content_processor = ContentProcessor()
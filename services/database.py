@@ -8,8 +8,9 @@ Purpose: Database connection management, session handling, and base model defini
 """
 
 from sqlalchemy import create_engine, MetaData, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import sessionmaker, scoped_session, Session
 from sqlalchemy.pool import StaticPool
 from typing import AsyncGenerator
 import structlog
@@ -27,17 +28,26 @@ if "sqlite" in settings.DATABASE_URL:
         echo=settings.DEBUG
     )
 else:
+    engine_options = {}
+    if make_url(settings.DATABASE_URL).get_driver_name() == "psycopg2":
+        # Send executemany UPDATEs (bulk_update_mappings) as psycopg2 batches
+        engine_options["executemany_mode"] = "values_plus_batch"
+    
     engine = create_engine(
         settings.DATABASE_URL,
         pool_pre_ping=True,
         pool_recycle=300,
         pool_size=10,
         max_overflow=20,
-        echo=settings.DEBUG
+        echo=settings.DEBUG,
+        **engine_options
     )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Thread-local session reused by every Celery task run on the same worker thread
+ScopedSession = scoped_session(SessionLocal)
+
 # Base class for all models
 Base = declarative_base()
 
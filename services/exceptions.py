@@ -87,3 +87,13 @@ class ExternalServiceError(HeadStartException):
             error_code="EXTERNAL_SERVICE_ERROR",
             status_code=status.HTTP_502_BAD_GATEWAY
         )
+
+class ContentProcessingError(HeadStartException):
+    """Content processing error exception"""
+
+    def __init__(self, message: str):
+        super().__init__(
+            message=message,
+            error_code="CONTENT_PROCESSING_ERROR",
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
@@ -7,13 +7,31 @@ Created: 2025-09-05
 Purpose: Define database schema and relationships for users, content, and recommendations
 """
 
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, ForeignKey, JSON
+from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, ForeignKey, JSON, LargeBinary
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from sqlalchemy.types import TypeDecorator
+import numpy as np
 import uuid
 from datetime import datetime
 from services.database import Base
 
+class HalfPrecisionEmbedding(TypeDecorator):
+    """Embedding vector stored as packed float16 bytes and exposed as a list of floats"""
+    impl = LargeBinary
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        # Empty vectors are stored as NULL so "has an embedding" is a plain IS NOT NULL
+        if value is None or len(value) == 0:
+            return None
+        return np.asarray(value, dtype=np.float16).tobytes()
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return np.frombuffer(value, dtype=np.float16).astype(np.float64).tolist()
+
 class User(Base):
     """User account model"""
     __tablename__ = "users"
@@ -73,8 +91,9 @@ class ContentItem(Base):
     topics = Column(JSON, default=list)  # Array of topic tags
     language = Column(String(10), default='en')
     content_metadata = Column(JSON, default=dict)  # Source-specific metadata
-    embedding = Column(JSON, default=list)  # OpenAI embedding dimension
+    embedding = Column(HalfPrecisionEmbedding)  # OpenAI embedding, 1536 float16 values
     status = Column(String(20), default='pending')  # 'pending', 'approved', 'rejected'
+    last_metadata_refresh_at = Column(DateTime(timezone=True))  # Last successful source metadata refresh
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
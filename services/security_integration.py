@@ -6,9 +6,11 @@ application services and provides security validation for deployments.
 """
 
 import asyncio
+import functools
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional
+from itertools import islice
+from typing import Dict, List, Optional, TypedDict
 
 from .security_scanner import SecurityScanner, SecurityScannerConfig, SeverityLevel
 from .vulnerability_analyzer import VulnerabilityAnalyzer, RemediationPriority
@@ -17,21 +19,50 @@ from config.security_config import get_security_config, create_scanner_config
 logger = logging.getLogger(__name__)
 
 
+class DeploymentReport(TypedDict, total=False):
+    """Deployment security report returned by ``validate_deployment_security``."""
+    deployment_ready: bool
+    scan_id: str
+    timestamp: str
+    environment: str
+    total_vulnerabilities: int
+    severity_breakdown: Dict[str, int]
+    compliance_status: Dict[str, bool]
+    critical_issues: List[Dict]
+    immediate_actions: List[Dict]
+    security_score: int
+    recommendations: List[str]
+    next_scan_recommended: str
+    error: str
+
+
 class SecurityValidationService:
     """Service for integrating security validation into the application lifecycle."""
     
     def __init__(self):
         """Initialize the security validation service."""
         self.security_config = get_security_config()
-        self.scanner_config = create_scanner_config(self.security_config)
-        self.scanner = SecurityScanner(self.scanner_config)
-        self.analyzer = VulnerabilityAnalyzer()
+    
+    @functools.cached_property
+    def scanner_config(self) -> SecurityScannerConfig:
+        """Scanner configuration derived from the security settings."""
+        return create_scanner_config(self.security_config)
+    
+    @functools.cached_property
+    def scanner(self) -> SecurityScanner:
+        """Security scanner, built on first scan."""
+        return SecurityScanner(self.scanner_config)
+    
+    @functools.cached_property
+    def analyzer(self) -> VulnerabilityAnalyzer:
+        """Vulnerability analyzer, built on first analysis."""
+        return VulnerabilityAnalyzer()
         
     async def validate_deployment_security(
         self, 
         project_path: str = ".",
         environment: str = "production"
-    ) -> Dict:
+    ) -> DeploymentReport:
         """
         Validate security for deployment readiness.
         
@@ -40,7 +71,7 @@ class SecurityValidationService:
             environment: Target deployment environment
             
         Returns:
-            Dict containing validation results and recommendations
+            DeploymentReport containing validation results and recommendations
         """
         logger.info(f"Starting security validation for {environment} deployment")
         
@@ -57,7 +88,7 @@ class SecurityValidationService:
             )
             
             # Generate deployment security report
-            security_report = {
+            security_report: DeploymentReport = {
                 "deployment_ready": deployment_ready,
                 "scan_id": scan_results.scan_id,
                 "timestamp": scan_results.timestamp.isoformat(),
@@ -71,7 +102,7 @@ class SecurityValidationService:
                 "critical_issues": self._extract_critical_issues(analysis_report),
                 "immediate_actions": self._extract_immediate_actions(analysis_report),
                 "security_score": self._calculate_security_score(scan_results),
-                "recommendations": analysis_report.recommendations[:5],  # Top 5
+                "recommendations": list(islice(analysis_report.recommendations, 5)),  # Top 5
                 "next_scan_recommended": self._calculate_next_scan_date()
             }
             
@@ -80,12 +111,13 @@ class SecurityValidationService:
             
         except Exception as e:
             logger.error(f"Security validation failed: {e}")
-            return {
+            error_report: DeploymentReport = {
                 "deployment_ready": False,
                 "error": str(e),
                 "timestamp": datetime.now().isoformat(),
                 "environment": environment
             }
+            return error_report
     
     async def continuous_security_monitoring(
         self, 
@@ -161,18 +193,20 @@ class SecurityValidationService:
     
     def _extract_critical_issues(self, analysis_report) -> List[Dict]:
         """Extract critical security issues that need immediate attention."""
-        critical_issues = []
-        
-        for assessment in analysis_report.risk_assessments:
-            if assessment.remediation_priority == RemediationPriority.IMMEDIATE:
-                critical_issues.append({
-                    "vulnerability_id": assessment.vulnerability_id,
-                    "risk_level": assessment.risk_level.value,
-                    "business_impact": assessment.business_impact,
-                    "estimated_hours": assessment.estimated_remediation_hours
-                })
+        immediate_assessments = (
+            assessment for assessment in analysis_report.risk_assessments
+            if assessment.remediation_priority == RemediationPriority.IMMEDIATE
+        )
         
-        return critical_issues[:10]  # Top 10 critical issues
+        return [
+            {
+                "vulnerability_id": assessment.vulnerability_id,
+                "risk_level": assessment.risk_level.value,
+                "business_impact": assessment.business_impact,
+                "estimated_hours": assessment.estimated_remediation_hours
+            }
+            for assessment in islice(immediate_assessments, 10)  # Top 10 critical issues
+        ]
     
     def _extract_immediate_actions(self, analysis_report) -> List[Dict]:
         """Extract immediate actions from remediation plan."""
@@ -186,7 +220,7 @@ class SecurityValidationService:
                 "estimated_hours": action.estimated_hours,
                 "affected_vulnerabilities_count": len(action.affected_vulnerabilities)
             }
-            for action in immediate_actions[:5]  # Top 5 immediate actions
+            for action in islice(immediate_actions, 5)  # Top 5 immediate actions
         ]
     
     def _calculate_security_score(self, scan_results) -> int:
@@ -253,8 +287,14 @@ class SecurityMiddleware:
         return response
 
 
+@functools.lru_cache(maxsize=1)
 def create_security_validation_service() -> SecurityValidationService:
-    """Factory function to create security validation service."""
+    """
+    Factory function to create security validation service.
+    
+    The service is cached as a process-wide singleton; call
+    ``create_security_validation_service.cache_clear()`` to force a rebuild.
+    """
     return SecurityValidationService()
 
 
@@ -10,22 +10,131 @@ This module provides security scanning capabilities including:
 """
 
 import asyncio
+import bisect
+import functools
 import json
 import logging
 import os
+import re
 import subprocess
 import tempfile
+import threading
+from collections import Counter
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from pathlib import Path
-from typing import Dict, List, Optional, Set, Union
+from typing import Dict, Iterable, Iterator, List, Optional, Pattern, Set, Tuple, Union
 
 import yaml
 from pydantic import BaseModel, Field
 
+try:
+    import hyperscan
+except ImportError:  # Optional accelerator for secrets detection
+    hyperscan = None
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # Optional faster JSON parser for tool output
+    from json import loads as json_loads
+
 logger = logging.getLogger(__name__)
 
+# Patterns for common secrets, compiled once and reused for every file
+SECRET_PATTERNS: Dict[str, str] = {
+    "AWS Access Key": r"AKIA[0-9A-Z]{16}",
+    "AWS Secret Key": r"[0-9a-zA-Z/+]{40}",
+    "GitHub Token": r"ghp_[0-9a-zA-Z]{36}",
+    "Generic API Key": r"[aA][pP][iI][_]?[kK][eE][yY].*['\"][0-9a-zA-Z]{32,45}['\"]",
+    "Generic Secret": r"[sS][eE][cC][rR][eE][tT].*['\"][0-9a-zA-Z]{16,}['\"]",
+    "Database URL": r"(postgresql|mysql|mongodb)://\S+",
+    "Private Key": r"-----BEGIN (RSA |EC |DSA )?PRIVATE KEY-----"
+}
+COMPILED_SECRET_PATTERNS: Dict[str, Pattern[str]] = {
+    name: re.compile(pattern, re.IGNORECASE) for name, pattern in SECRET_PATTERNS.items()
+}
+
+SECRET_PATTERN_NAMES: List[str] = list(SECRET_PATTERNS)
+
+# Casefolded literals at least one of which must appear for a pattern to match.
+# Patterns without a literal anchor (AWS Secret Key) are always run.
+SECRET_PATTERN_LITERALS: Dict[str, Tuple[str, ...]] = {
+    "AWS Access Key": ("akia",),
+    "GitHub Token": ("ghp_",),
+    "Generic API Key": ("apikey", "api_key"),
+    "Generic Secret": ("secret",),
+    "Database URL": ("postgresql://", "mysql://", "mongodb://"),
+    "Private Key": ("private key-----",)
+}
+# Casefolded fixed prefixes every match starts with; these patterns are only
+# tried at the offsets where their prefix occurs instead of at every position
+SECRET_PATTERN_PREFIXES: Dict[str, str] = {
+    "AWS Access Key": "akia",
+    "GitHub Token": "ghp_",
+    "Private Key": "-----begin "
+}
+SECRET_SCAN_SUFFIXES = frozenset({'py', 'js', 'ts', 'json', 'yaml', 'yml', 'env'})
+
+# Requirements files checked by Safety, at the project root and under requirements/
+SAFETY_REQUIREMENTS_FILES = ("requirements.txt", "requirements-dev.txt")
+SAFETY_REQUIREMENTS_DIR_FILES = ("base.txt", "production.txt")
+
+# Maximum number of file batches read and scanned concurrently by the secrets scan
+SECRETS_SCAN_CONCURRENCY = 64
+# Files handed to a worker thread per batch, so thread hand-offs are paid per batch
+SECRETS_SCAN_BATCH_SIZE = 32
+
+# Files and matches that are treated as examples rather than real secrets
+SECRET_SKIP_PATH_KEYWORDS = ('test', 'example', 'sample', 'demo')
+SECRET_PLACEHOLDER_KEYWORDS = ('example', 'placeholder', 'your_', 'xxx', 'test')
+
+# Dockerfile instructions flagged by the container scan, matched against raw lines
+DOCKERFILE_ROOT_USER_RE = re.compile(rb'^\s*USER\s+(root|0)\b', re.IGNORECASE)
+DOCKERFILE_LOCAL_ADD_RE = re.compile(rb'^\s*ADD\s(?!.*https?://)', re.IGNORECASE)
+DOCKERFILE_LATEST_TAG_RE = re.compile(rb'^\s*FROM\b.*:latest\b', re.IGNORECASE)
+
+
+
+@functools.lru_cache(maxsize=1)
+def get_secrets_database():
+    """
+    Compile the secret patterns into a Hyperscan database.
+    
+    The database reports which patterns occur anywhere in a file in a single
+    pass, so the slower ``re`` scan only runs for patterns that can match.
+    
+    Returns:
+        hyperscan.Database, or None when Hyperscan is unavailable
+    """
+    if hyperscan is None:
+        return None
+    
+    try:
+        database = hyperscan.Database()
+        database.compile(
+            expressions=[pattern.encode() for pattern in SECRET_PATTERNS.values()],
+            ids=list(range(len(SECRET_PATTERNS))),
+            elements=len(SECRET_PATTERNS),
+            flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(SECRET_PATTERNS)
+        )
+        return database
+    except hyperscan.error as e:
+        logger.warning(f"Could not compile Hyperscan secrets database, using re only: {e}")
+        return None
+
+
+# Hyperscan scratch space cannot be shared between threads scanning concurrently
+_hyperscan_thread_state = threading.local()
+
+
+def _get_hyperscan_scratch(database):
+    """Get the Hyperscan scratch space for the current thread."""
+    scratch = getattr(_hyperscan_thread_state, "scratch", None)
+    if scratch is None:
+        scratch = hyperscan.Scratch(database)
+        _hyperscan_thread_state.scratch = scratch
+    return scratch
+
 
 class SeverityLevel(str, Enum):
     """Security vulnerability severity levels."""
@@ -45,7 +154,15 @@ class VulnerabilityType(str, Enum):
     CONFIGURATION_ISSUE = "CONFIGURATION_ISSUE"
 
 
-@dataclass
+# Bandit issue_severity values mapped to severity levels; anything else is LOW
+BANDIT_SEVERITY_MAP: Dict[str, SeverityLevel] = {
+    "HIGH": SeverityLevel.HIGH,
+    "MEDIUM": SeverityLevel.MEDIUM,
+    "LOW": SeverityLevel.LOW
+}
+
+
+@dataclass(slots=True)
 class Vulnerability:
     """Represents a security vulnerability."""
     id: str
@@ -62,7 +179,7 @@ class Vulnerability:
     more_info: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ScanResult:
     """Base class for security scan results."""
     tool_name: str
@@ -73,7 +190,7 @@ class ScanResult:
     metadata: Dict = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class SecurityScanResults:
     """Comprehensive security scan results."""
     scan_id: str
@@ -87,23 +204,26 @@ class SecurityScanResults:
     
     def get_critical_vulnerabilities(self) -> List[Vulnerability]:
         """Get all critical vulnerabilities."""
-        critical_vulns = []
-        for scan_result in self.scan_results:
-            critical_vulns.extend([
-                v for v in scan_result.vulnerabilities 
-                if v.severity == SeverityLevel.CRITICAL
-            ])
-        return critical_vulns
+        return [
+            v for scan_result in self.scan_results
+            for v in scan_result.vulnerabilities
+            if v.severity is SeverityLevel.CRITICAL
+        ]
     
     def get_high_vulnerabilities(self) -> List[Vulnerability]:
         """Get all high severity vulnerabilities."""
-        high_vulns = []
-        for scan_result in self.scan_results:
-            high_vulns.extend([
-                v for v in scan_result.vulnerabilities 
-                if v.severity == SeverityLevel.HIGH
-            ])
-        return high_vulns
+        return [
+            v for scan_result in self.scan_results
+            for v in scan_result.vulnerabilities
+            if v.severity is SeverityLevel.HIGH
+        ]
+
+
+@dataclass
+class ProjectFileIndex:
+    """Files of interest found in a single walk of the project tree."""
+    secret_candidates: List[Tuple[str, str]] = field(default_factory=list)
+    dockerfiles: List[Tuple[str, str]] = field(default_factory=list)
 
 
 class SecurityScannerConfig(BaseModel):
@@ -127,51 +247,60 @@ class SecurityScanner:
     def __init__(self, config: Optional[SecurityScannerConfig] = None):
         """Initialize the security scanner."""
         self.config = config or SecurityScannerConfig()
-        self.scan_id = f"security_scan_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self._exclude_set = frozenset(self.config.exclude_paths)
+        self.scan_id = self._new_scan_id()
+    
+    @staticmethod
+    def _new_scan_id() -> str:
+        """Build a scan ID from the current time, down to the microsecond."""
+        return f"security_scan_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
         
     async def run_comprehensive_scan(
         self, 
         project_path: str = "."
     ) -> SecurityScanResults:
         """Run comprehensive security scan including all enabled tools."""
-        logger.info(f"Starting comprehensive security scan: {self.scan_id}")
+        # Scanners are long-lived (the validation service caches one), so every run gets its own ID
+        scan_id = self.scan_id = self._new_scan_id()
+        logger.info(f"Starting comprehensive security scan: {scan_id}")
         start_time = datetime.now()
         
-        scan_results = []
-        
-        # Run static code analysis with Bandit
-        bandit_result = await self.run_bandit_scan(project_path)
-        if bandit_result:
-            scan_results.append(bandit_result)
+        # Walk the project tree once for the file-based scans
+        project_files = None
+        if self.config.secrets_scan_enabled or self.config.container_scan_enabled:
+            project_files = await asyncio.to_thread(self._index_project_files, project_path)
         
-        # Run dependency vulnerability scan with Safety
-        safety_result = await self.run_safety_scan(project_path)
-        if safety_result:
-            scan_results.append(safety_result)
+        # Run static code analysis with Bandit and dependency vulnerability scan with Safety
+        scans = [
+            self.run_bandit_scan(project_path),
+            self.run_safety_scan(project_path)
+        ]
         
         # Run secrets detection
         if self.config.secrets_scan_enabled:
-            secrets_result = await self.run_secrets_scan(project_path)
-            if secrets_result:
-                scan_results.append(secrets_result)
+            scans.append(self.run_secrets_scan(project_path, project_files=project_files))
         
         # Run container security scan if enabled
         if self.config.container_scan_enabled:
-            container_result = await self.run_container_scan(project_path)
-            if container_result:
-                scan_results.append(container_result)
+            scans.append(self.run_container_scan(project_path, project_files=project_files))
         
-        # Aggregate results
-        all_vulnerabilities = []
-        for result in scan_results:
-            all_vulnerabilities.extend(result.vulnerabilities)
+        # The tools are independent, so run them concurrently; gather keeps their order
+        scan_results = []
+        for result in await asyncio.gather(*scans, return_exceptions=True):
+            if isinstance(result, BaseException):
+                logger.error(f"Security scan tool failed: {result}")
+            elif result:
+                scan_results.append(result)
         
-        severity_counts = self._count_vulnerabilities_by_severity(all_vulnerabilities)
+        # Aggregate results in a single pass without building a flat vulnerability list
+        severity_counts = self._count_vulnerabilities_by_severity(
+            vuln for result in scan_results for vuln in result.vulnerabilities
+        )
         
         return SecurityScanResults(
-            scan_id=self.scan_id,
+            scan_id=scan_id,
             timestamp=start_time,
-            total_vulnerabilities=len(all_vulnerabilities),
+            total_vulnerabilities=sum(severity_counts.values()),
             severity_counts=severity_counts,
             scan_results=scan_results,
             compliance_status=self._assess_compliance(severity_counts),
@@ -184,12 +313,17 @@ class SecurityScanner:
         logger.info("Running Bandit static code analysis")
         start_time = datetime.now()
         
+        # Bandit writes its JSON report to a file so large reports never sit in a pipe buffer
+        report_fd, report_path = tempfile.mkstemp(prefix=f"bandit-{self.scan_id}-", suffix=".json")
+        os.close(report_fd)
+        
         try:
             # Prepare Bandit command
             cmd = [
                 "bandit",
                 "-r", project_path,
                 "-f", "json",
+                "-o", report_path,
                 "--skip", ",".join(self.config.exclude_paths)
             ]
             
@@ -199,11 +333,11 @@ class SecurityScanner:
             # Run Bandit
             process = await asyncio.create_subprocess_exec(
                 *cmd,
-                stdout=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.DEVNULL,
                 stderr=asyncio.subprocess.PIPE
             )
             
-            stdout, stderr = await process.communicate()
+            _, stderr = await process.communicate()
             duration = (datetime.now() - start_time).total_seconds()
             
             if process.returncode not in [0, 1]:  # Bandit returns 1 when issues found
@@ -211,7 +345,8 @@ class SecurityScanner:
                 return None
             
             # Parse Bandit results
-            vulnerabilities = self._parse_bandit_results(stdout.decode())
+            with open(report_path, 'rb') as f:
+                vulnerabilities = self._parse_bandit_results(f.read())
             
             return ScanResult(
                 tool_name="Bandit",
@@ -225,6 +360,12 @@ class SecurityScanner:
         except Exception as e:
             logger.error(f"Error running Bandit scan: {e}")
             return None
+        
+        finally:
+            try:
+                os.unlink(report_path)
+            except OSError:
+                pass
     
     async def run_safety_scan(self, project_path: str) -> Optional[ScanResult]:
         """Run Safety dependency vulnerability scan."""
@@ -233,18 +374,7 @@ class SecurityScanner:
         
         try:
             # Look for requirements files
-            requirements_files = [
-                "requirements.txt",
-                "requirements-dev.txt",
-                "requirements/base.txt",
-                "requirements/production.txt"
-            ]
-            
-            found_requirements = []
-            for req_file in requirements_files:
-                req_path = Path(project_path) / req_file
-                if req_path.exists():
-                    found_requirements.append(str(req_path))
+            found_requirements = self._find_requirements_files(project_path)
             
             if not found_requirements:
                 logger.warning("No requirements files found for Safety scan")
@@ -252,23 +382,18 @@ class SecurityScanner:
             
             vulnerabilities = []
             
-            for req_file in found_requirements:
-                cmd = ["safety", "check", "-r", req_file, "--json"]
-                
-                process = await asyncio.create_subprocess_exec(
-                    *cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                
-                stdout, stderr = await process.communicate()
-                
-                if process.returncode == 0:
+            # Each requirements file gets its own Safety process; run them concurrently
+            safety_outputs = await asyncio.gather(
+                *(self._run_safety_check(req_file) for req_file in found_requirements)
+            )
+            
+            for req_file, returncode, stdout, stderr in safety_outputs:
+                if returncode == 0:
                     # No vulnerabilities found
                     continue
-                elif process.returncode == 64:
+                elif returncode == 64:
                     # Vulnerabilities found
-                    vulns = self._parse_safety_results(stdout.decode(), req_file)
+                    vulns = self._parse_safety_results(stdout, req_file)
                     vulnerabilities.extend(vulns)
                 else:
                     logger.error(f"Safety scan failed for {req_file}: {stderr.decode()}")
@@ -288,46 +413,89 @@ class SecurityScanner:
             logger.error(f"Error running Safety scan: {e}")
             return None
     
-    async def run_secrets_scan(self, project_path: str) -> Optional[ScanResult]:
-        """Run secrets detection scan."""
+    def _find_requirements_files(self, project_path: str) -> List[str]:
+        """
+        Return the paths of the requirements files present in the project.
+        
+        Lists the project root, and the ``requirements`` directory only when
+        the root listing contains it, instead of probing every candidate path.
+        """
+        found_requirements = []
+        
+        try:
+            with os.scandir(project_path) as entries:
+                root_entries = {entry.name: entry for entry in entries}
+        except OSError:
+            return found_requirements
+        
+        for name in SAFETY_REQUIREMENTS_FILES:
+            entry = root_entries.get(name)
+            if entry is not None and entry.is_file():
+                found_requirements.append(entry.path)
+        
+        requirements_dir = root_entries.get("requirements")
+        if requirements_dir is not None and requirements_dir.is_dir():
+            try:
+                with os.scandir(requirements_dir.path) as entries:
+                    dir_entries = {entry.name: entry for entry in entries}
+            except OSError:
+                dir_entries = {}
+            
+            for name in SAFETY_REQUIREMENTS_DIR_FILES:
+                entry = dir_entries.get(name)
+                if entry is not None and entry.is_file():
+                    found_requirements.append(entry.path)
+        
+        return found_requirements
+    
+    async def _run_safety_check(self, req_file: str) -> Tuple[str, int, bytes, bytes]:
+        """Run Safety against one requirements file and return its raw output."""
+        cmd = ["safety", "check", "-r", req_file, "--json"]
+        
+        # Reuse a local vulnerability database instead of fetching one per process
+        if self.config.safety_db_path:
+            cmd.extend(["--db", self.config.safety_db_path])
+        
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        
+        stdout, stderr = await process.communicate()
+        return req_file, process.returncode, stdout, stderr
+    
+    async def run_secrets_scan(
+        self, 
+        project_path: str, 
+        project_files: Optional[ProjectFileIndex] = None
+    ) -> Optional[ScanResult]:
+        """Run secrets detection scan, walking the project unless an index is given."""
         logger.info("Running secrets detection scan")
         start_time = datetime.now()
         
         try:
             vulnerabilities = []
+            secret_patterns = COMPILED_SECRET_PATTERNS
             
-            # Define patterns for common secrets
-            secret_patterns = {
-                "AWS Access Key": r"AKIA[0-9A-Z]{16}",
-                "AWS Secret Key": r"[0-9a-zA-Z/+]{40}",
-                "GitHub Token": r"ghp_[0-9a-zA-Z]{36}",
-                "Generic API Key": r"[aA][pP][iI][_]?[kK][eE][yY].*['\"][0-9a-zA-Z]{32,45}['\"]",
-                "Generic Secret": r"[sS][eE][cC][rR][eE][tT].*['\"][0-9a-zA-Z]{16,}['\"]",
-                "Database URL": r"(postgresql|mysql|mongodb)://[^\\s]+",
-                "Private Key": r"-----BEGIN (RSA |EC |DSA )?PRIVATE KEY-----"
-            }
-            
-            # Scan files for secrets
-            for root, dirs, files in os.walk(project_path):
-                # Skip excluded directories
-                dirs[:] = [d for d in dirs if d not in self.config.exclude_paths]
-                
-                for file in files:
-                    if file.endswith(('.py', '.js', '.ts', '.json', '.yaml', '.yml', '.env')):
-                        file_path = os.path.join(root, file)
-                        relative_path = os.path.relpath(file_path, project_path)
-                        
-                        try:
-                            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                                content = f.read()
-                                
-                            secrets_found = self._scan_file_for_secrets(
-                                content, relative_path, secret_patterns
-                            )
-                            vulnerabilities.extend(secrets_found)
-                            
-                        except Exception as e:
-                            logger.warning(f"Could not scan file {file_path}: {e}")
+            # Collect candidate files
+            if project_files is None:
+                project_files = await asyncio.to_thread(self._index_project_files, project_path)
+            candidate_files = project_files.secret_candidates
+            
+            # Read and scan batches of files for secrets in worker threads
+            semaphore = asyncio.Semaphore(SECRETS_SCAN_CONCURRENCY)
+            
+            async def scan_batch(batch: List[Tuple[str, str]]) -> List[Vulnerability]:
+                async with semaphore:
+                    return await asyncio.to_thread(self._scan_file_batch_for_secrets, batch, secret_patterns)
+            
+            batch_results = await asyncio.gather(*(
+                scan_batch(candidate_files[i:i + SECRETS_SCAN_BATCH_SIZE])
+                for i in range(0, len(candidate_files), SECRETS_SCAN_BATCH_SIZE)
+            ))
+            for secrets_found in batch_results:
+                vulnerabilities.extend(secrets_found)
             
             duration = (datetime.now() - start_time).total_seconds()
             
@@ -344,8 +512,12 @@ class SecurityScanner:
             logger.error(f"Error running secrets scan: {e}")
             return None
     
-    async def run_container_scan(self, project_path: str) -> Optional[ScanResult]:
-        """Run container security scan."""
+    async def run_container_scan(
+        self, 
+        project_path: str, 
+        project_files: Optional[ProjectFileIndex] = None
+    ) -> Optional[ScanResult]:
+        """Run container security scan, walking the project unless an index is given."""
         logger.info("Running container security scan")
         start_time = datetime.now()
         
@@ -353,20 +525,20 @@ class SecurityScanner:
             vulnerabilities = []
             
             # Look for Dockerfiles
-            dockerfiles = []
-            for root, dirs, files in os.walk(project_path):
-                for file in files:
-                    if file.lower().startswith('dockerfile'):
-                        dockerfiles.append(os.path.join(root, file))
+            if project_files is None:
+                project_files = await asyncio.to_thread(self._index_project_files, project_path)
+            dockerfiles = project_files.dockerfiles
             
             if not dockerfiles:
                 logger.info("No Dockerfiles found for container scan")
                 return None
             
-            # Analyze Dockerfiles for security issues
-            for dockerfile_path in dockerfiles:
-                relative_path = os.path.relpath(dockerfile_path, project_path)
-                docker_vulns = await self._analyze_dockerfile(dockerfile_path, relative_path)
+            # Analyze Dockerfiles for security issues in worker threads
+            dockerfile_results = await asyncio.gather(*(
+                asyncio.to_thread(self._analyze_dockerfile, dockerfile_path, relative_path)
+                for dockerfile_path, relative_path in dockerfiles
+            ))
+            for docker_vulns in dockerfile_results:
                 vulnerabilities.extend(docker_vulns)
             
             duration = (datetime.now() - start_time).total_seconds()
@@ -384,28 +556,74 @@ class SecurityScanner:
             logger.error(f"Error running container scan: {e}")
             return None
     
-    def _parse_bandit_results(self, bandit_output: str) -> List[Vulnerability]:
-        """Parse Bandit JSON output into Vulnerability objects."""
+    def _index_project_files(self, project_path: str) -> ProjectFileIndex:
+        """Walk the project once and collect the files used by the file-based scans."""
+        project_files = ProjectFileIndex()
+        
+        for file_path, file_name in self._walk_project(project_path):
+            _, dot, suffix = file_name.rpartition('.')
+            is_secret_candidate = bool(dot) and suffix in SECRET_SCAN_SUFFIXES
+            is_dockerfile = file_name[:10].lower() == 'dockerfile'
+            if not (is_secret_candidate or is_dockerfile):
+                continue
+            
+            relative_path = os.path.relpath(file_path, project_path)
+            if is_secret_candidate:
+                project_files.secret_candidates.append((file_path, relative_path))
+            if is_dockerfile:
+                project_files.dockerfiles.append((file_path, relative_path))
+        
+        return project_files
+    
+    def _walk_project(self, project_path: str) -> Iterator[Tuple[str, str]]:
+        """
+        Yield ``(file_path, file_name)`` for every file under the project.
+        
+        Uses ``os.scandir`` so entry types come from the directory listing
+        instead of a separate stat call, and prunes excluded directories
+        before descending. Files are yielded in the same order as ``os.walk``.
+        """
+        pending_dirs = [project_path]
+        
+        while pending_dirs:
+            current_dir = pending_dirs.pop()
+            subdirs = []
+            
+            try:
+                with os.scandir(current_dir) as entries:
+                    for entry in entries:
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+                        
+                        if not is_dir:
+                            yield entry.path, entry.name
+                        elif entry.name not in self._exclude_set and not entry.is_symlink():
+                            subdirs.append(entry.path)
+            except OSError as e:
+                logger.debug(f"Could not list directory {current_dir}: {e}")
+                continue
+            
+            # Visit subdirectories depth-first in listing order
+            pending_dirs.extend(reversed(subdirs))
+    
+    def _parse_bandit_results(self, bandit_output: Union[bytes, str]) -> List[Vulnerability]:
+        """Parse Bandit JSON output (raw bytes or text) into Vulnerability objects."""
         vulnerabilities = []
         
         try:
             if not bandit_output.strip():
                 return vulnerabilities
                 
-            data = json.loads(bandit_output)
+            data = json_loads(bandit_output)
             
             for result in data.get("results", []):
-                severity_map = {
-                    "HIGH": SeverityLevel.HIGH,
-                    "MEDIUM": SeverityLevel.MEDIUM,
-                    "LOW": SeverityLevel.LOW
-                }
-                
                 vulnerability = Vulnerability(
                     id=f"BANDIT-{result.get('test_id', 'UNKNOWN')}",
                     title=result.get("test_name", "Unknown Bandit Issue"),
                     description=result.get("issue_text", ""),
-                    severity=severity_map.get(result.get("issue_severity", "LOW"), SeverityLevel.LOW),
+                    severity=BANDIT_SEVERITY_MAP.get(result.get("issue_severity", "LOW"), SeverityLevel.LOW),
                     vulnerability_type=VulnerabilityType.CODE_VULNERABILITY,
                     file_path=result.get("filename"),
                     line_number=result.get("line_number"),
@@ -422,15 +640,19 @@ class SecurityScanner:
         
         return vulnerabilities
     
-    def _parse_safety_results(self, safety_output: str, requirements_file: str) -> List[Vulnerability]:
-        """Parse Safety JSON output into Vulnerability objects."""
+    def _parse_safety_results(
+        self, 
+        safety_output: Union[bytes, str], 
+        requirements_file: str
+    ) -> List[Vulnerability]:
+        """Parse Safety JSON output (raw bytes or text) into Vulnerability objects."""
         vulnerabilities = []
         
         try:
             if not safety_output.strip():
                 return vulnerabilities
                 
-            data = json.loads(safety_output)
+            data = json_loads(safety_output)
             
             for vuln_data in data:
                 vulnerability = Vulnerability(
@@ -453,94 +675,200 @@ class SecurityScanner:
         
         return vulnerabilities
     
+    def _scan_file_batch_for_secrets(
+        self, 
+        batch: List[Tuple[str, str]], 
+        patterns: Dict[str, Pattern[str]]
+    ) -> List[Vulnerability]:
+        """Read and scan a batch of ``(file_path, relative_path)`` files for potential secrets."""
+        vulnerabilities = []
+        for file_path, relative_path in batch:
+            vulnerabilities.extend(self._scan_file_path_for_secrets(file_path, relative_path, patterns))
+        return vulnerabilities
+    
+    def _scan_file_path_for_secrets(
+        self, 
+        file_path: str, 
+        relative_path: str, 
+        patterns: Dict[str, Pattern[str]]
+    ) -> List[Vulnerability]:
+        """Read a file from disk and scan it for potential secrets."""
+        try:
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.read()
+            
+            return self._scan_file_for_secrets(content, relative_path, patterns)
+            
+        except Exception as e:
+            logger.warning(f"Could not scan file {file_path}: {e}")
+            return []
+    
     def _scan_file_for_secrets(
         self, 
         content: str, 
         file_path: str, 
-        patterns: Dict[str, str]
+        patterns: Dict[str, Pattern[str]]
     ) -> List[Vulnerability]:
         """Scan file content for potential secrets."""
-        import re
-        
         vulnerabilities = []
-        lines = content.split('\n')
+        
+        # Skip if it looks like a test or example
+        lowered_path = file_path.lower()
+        if any(keyword in lowered_path for keyword in SECRET_SKIP_PATH_KEYWORDS):
+            return vulnerabilities
+        
+        # Narrow down to the patterns that occur in this file
+        if patterns is COMPILED_SECRET_PATTERNS:
+            patterns = self._prefilter_secret_patterns(content)
+            if not patterns:
+                return vulnerabilities
+        
+        # Offsets of every newline, used to map match offsets to line numbers.
+        # Built on the first reported match, so files without findings skip it.
+        newline_offsets = None
+        
+        # Casefolded copy for locating fixed prefixes, usable only while offsets line up
+        folded_content = None
+        if any(name in SECRET_PATTERN_PREFIXES for name in patterns):
+            folded_content = content.casefold()
+            if len(folded_content) != len(content):
+                folded_content = None
         
         for pattern_name, pattern in patterns.items():
-            for line_num, line in enumerate(lines, 1):
-                matches = re.finditer(pattern, line, re.IGNORECASE)
-                for match in matches:
-                    # Skip if it looks like a test or example
-                    if any(keyword in file_path.lower() for keyword in ['test', 'example', 'sample', 'demo']):
-                        continue
-                    
-                    # Skip if it's clearly a placeholder
-                    matched_text = match.group(0)
-                    if any(placeholder in matched_text.lower() for placeholder in ['example', 'placeholder', 'your_', 'xxx', 'test']):
-                        continue
-                    
-                    vulnerability = Vulnerability(
-                        id=f"SECRET-{pattern_name.replace(' ', '_').upper()}-{line_num}",
-                        title=f"Potential {pattern_name} exposure",
-                        description=f"Potential {pattern_name} found in source code",
-                        severity=SeverityLevel.CRITICAL,
-                        vulnerability_type=VulnerabilityType.SECRET_EXPOSURE,
-                        file_path=file_path,
-                        line_number=line_num,
-                        remediation=f"Remove hardcoded {pattern_name} and use environment variables or secure secret management"
-                    )
-                    vulnerabilities.append(vulnerability)
+            # Per-pattern text shared by every finding of this pattern
+            id_prefix = f"SECRET-{pattern_name.replace(' ', '_').upper()}-"
+            title = f"Potential {pattern_name} exposure"
+            description = f"Potential {pattern_name} found in source code"
+            remediation = f"Remove hardcoded {pattern_name} and use environment variables or secure secret management"
+            
+            for match in self._iter_secret_matches(pattern_name, pattern, content, folded_content):
+                # Skip if it's clearly a placeholder
+                matched_text = match.group(0).lower()
+                if any(placeholder in matched_text for placeholder in SECRET_PLACEHOLDER_KEYWORDS):
+                    continue
+                
+                if newline_offsets is None:
+                    newline_offsets = [newline.start() for newline in re.finditer('\n', content)]
+                line_num = bisect.bisect_left(newline_offsets, match.start()) + 1
+                vulnerability = Vulnerability(
+                    id=f"{id_prefix}{line_num}",
+                    title=title,
+                    description=description,
+                    severity=SeverityLevel.CRITICAL,
+                    vulnerability_type=VulnerabilityType.SECRET_EXPOSURE,
+                    file_path=file_path,
+                    line_number=line_num,
+                    remediation=remediation
+                )
+                vulnerabilities.append(vulnerability)
         
         return vulnerabilities
     
-    async def _analyze_dockerfile(self, dockerfile_path: str, relative_path: str) -> List[Vulnerability]:
+    def _iter_secret_matches(
+        self, 
+        pattern_name: str, 
+        pattern: Pattern[str], 
+        content: str, 
+        folded_content: Optional[str]
+    ) -> Iterator[re.Match]:
+        """Yield non-overlapping matches of a secret pattern, jumping between fixed-prefix hits."""
+        prefix = SECRET_PATTERN_PREFIXES.get(pattern_name)
+        if (
+            prefix is None
+            or folded_content is None
+            or pattern is not COMPILED_SECRET_PATTERNS.get(pattern_name)
+        ):
+            yield from pattern.finditer(content)
+            return
+        
+        offset = folded_content.find(prefix)
+        while offset != -1:
+            match = pattern.match(content, offset)
+            if match:
+                yield match
+                offset = folded_content.find(prefix, max(match.end(), offset + 1))
+            else:
+                offset = folded_content.find(prefix, offset + 1)
+    
+    def _prefilter_secret_patterns(self, content: str) -> Dict[str, Pattern[str]]:
+        """Return the built-in secret patterns that occur in the content."""
+        database = get_secrets_database()
+        if database is None:
+            return self._prefilter_secret_literals(content)
+        
+        matched_ids = set()
+        
+        def on_match(pattern_id, start, end, flags, context):
+            matched_ids.add(pattern_id)
+        
+        database.scan(
+            content.encode('utf-8', 'ignore'),
+            match_event_handler=on_match,
+            scratch=_get_hyperscan_scratch(database)
+        )
+        
+        return {
+            name: COMPILED_SECRET_PATTERNS[name]
+            for pattern_id, name in enumerate(SECRET_PATTERN_NAMES)
+            if pattern_id in matched_ids
+        }
+    
+    def _prefilter_secret_literals(self, content: str) -> Dict[str, Pattern[str]]:
+        """Return the built-in secret patterns whose literal anchors occur in the content."""
+        folded_content = content.casefold()
+        
+        return {
+            name: pattern
+            for name, pattern in COMPILED_SECRET_PATTERNS.items()
+            if name not in SECRET_PATTERN_LITERALS
+            or any(literal in folded_content for literal in SECRET_PATTERN_LITERALS[name])
+        }
+    
+    def _analyze_dockerfile(self, dockerfile_path: str, relative_path: str) -> List[Vulnerability]:
         """Analyze Dockerfile for security issues."""
         vulnerabilities = []
         
         try:
-            with open(dockerfile_path, 'r') as f:
-                lines = f.readlines()
-            
-            for line_num, line in enumerate(lines, 1):
-                line = line.strip().upper()
-                
-                # Check for running as root
-                if line.startswith('USER ROOT') or (line.startswith('USER') and '0' in line):
-                    vulnerabilities.append(Vulnerability(
-                        id=f"DOCKER-ROOT-USER-{line_num}",
-                        title="Container running as root user",
-                        description="Container is configured to run as root user, which poses security risks",
-                        severity=SeverityLevel.HIGH,
-                        vulnerability_type=VulnerabilityType.CONFIGURATION_ISSUE,
-                        file_path=relative_path,
-                        line_number=line_num,
-                        remediation="Create and use a non-root user in the container"
-                    ))
-                
-                # Check for ADD instead of COPY
-                if line.startswith('ADD ') and not any(url in line for url in ['HTTP://', 'HTTPS://']):
-                    vulnerabilities.append(Vulnerability(
-                        id=f"DOCKER-ADD-USAGE-{line_num}",
-                        title="Use of ADD instead of COPY",
-                        description="ADD has additional features that can be security risks. Use COPY when possible",
-                        severity=SeverityLevel.MEDIUM,
-                        vulnerability_type=VulnerabilityType.CONFIGURATION_ISSUE,
-                        file_path=relative_path,
-                        line_number=line_num,
-                        remediation="Use COPY instead of ADD for local files"
-                    ))
-                
-                # Check for latest tag usage
-                if 'FROM' in line and ':LATEST' in line:
-                    vulnerabilities.append(Vulnerability(
-                        id=f"DOCKER-LATEST-TAG-{line_num}",
-                        title="Use of 'latest' tag in base image",
-                        description="Using 'latest' tag can lead to unpredictable builds and security issues",
-                        severity=SeverityLevel.MEDIUM,
-                        vulnerability_type=VulnerabilityType.CONFIGURATION_ISSUE,
-                        file_path=relative_path,
-                        line_number=line_num,
-                        remediation="Use specific version tags for base images"
-                    ))
+            with open(dockerfile_path, 'rb') as f:
+                for line_num, line in enumerate(f, 1):
+                    # Check for running as root
+                    if DOCKERFILE_ROOT_USER_RE.match(line):
+                        vulnerabilities.append(Vulnerability(
+                            id=f"DOCKER-ROOT-USER-{line_num}",
+                            title="Container running as root user",
+                            description="Container is configured to run as root user, which poses security risks",
+                            severity=SeverityLevel.HIGH,
+                            vulnerability_type=VulnerabilityType.CONFIGURATION_ISSUE,
+                            file_path=relative_path,
+                            line_number=line_num,
+                            remediation="Create and use a non-root user in the container"
+                        ))
+                    
+                    # Check for ADD instead of COPY
+                    if DOCKERFILE_LOCAL_ADD_RE.match(line):
+                        vulnerabilities.append(Vulnerability(
+                            id=f"DOCKER-ADD-USAGE-{line_num}",
+                            title="Use of ADD instead of COPY",
+                            description="ADD has additional features that can be security risks. Use COPY when possible",
+                            severity=SeverityLevel.MEDIUM,
+                            vulnerability_type=VulnerabilityType.CONFIGURATION_ISSUE,
+                            file_path=relative_path,
+                            line_number=line_num,
+                            remediation="Use COPY instead of ADD for local files"
+                        ))
+                    
+                    # Check for latest tag usage
+                    if DOCKERFILE_LATEST_TAG_RE.match(line):
+                        vulnerabilities.append(Vulnerability(
+                            id=f"DOCKER-LATEST-TAG-{line_num}",
+                            title="Use of 'latest' tag in base image",
+                            description="Using 'latest' tag can lead to unpredictable builds and security issues",
+                            severity=SeverityLevel.MEDIUM,
+                            vulnerability_type=VulnerabilityType.CONFIGURATION_ISSUE,
+                            file_path=relative_path,
+                            line_number=line_num,
+                            remediation="Use specific version tags for base images"
+                        ))
         
         except Exception as e:
             logger.error(f"Error analyzing Dockerfile {dockerfile_path}: {e}")
@@ -549,15 +877,12 @@ class SecurityScanner:
     
     def _count_vulnerabilities_by_severity(
         self, 
-        vulnerabilities: List[Vulnerability]
+        vulnerabilities: Iterable[Vulnerability]
     ) -> Dict[SeverityLevel, int]:
         """Count vulnerabilities by severity level."""
-        counts = {severity: 0 for severity in SeverityLevel}
-        
-        for vuln in vulnerabilities:
-            counts[vuln.severity] += 1
+        counts = Counter(vuln.severity for vuln in vulnerabilities)
         
-        return counts
+        return {severity: counts[severity] for severity in SeverityLevel}
     
     def _assess_compliance(self, severity_counts: Dict[SeverityLevel, int]) -> Dict[str, bool]:
         """Assess compliance based on vulnerability counts."""
@@ -7,24 +7,96 @@ Created: 2025-09-05
 Purpose: Background tasks for content processing, embedding generation, and batch operations
 """
 
-from celery import current_task
-from sqlalchemy.orm import Session
+from celery import current_task, group
+from sqlalchemy import delete, or_, update
+from sqlalchemy.orm import Session, load_only
 import structlog
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import os
+import redis
 
+from config.settings import get_settings
 from services.celery_app import celery_app
-from services.database import SessionLocal
+from services.database import ScopedSession
 from services.models import ContentItem
 from services.content_processing import content_processor
 from services.exceptions import ContentProcessingError
 
 logger = structlog.get_logger()
 
+# True for content without a stored embedding; empty vectors are stored as NULL
+EMBEDDING_MISSING = ContentItem.embedding.is_(None)
+
+# Maximum number of source metadata requests in flight during a metadata refresh
+METADATA_REFRESH_CONCURRENCY = 20
+
+# Threads used to remove stale upload files, which may sit on slow network storage
+UPLOAD_CLEANUP_WORKERS = 16
+
+# Adaptive polling for periodic maintenance tasks: after consecutive runs that find
+# no work, later runs are skipped for a window that doubles each time up to the
+# maximum, and any run that finds work resets the backoff
+POLL_BACKOFF_BASE_SECONDS = 15 * 60
+POLL_BACKOFF_MAX_SECONDS = 4 * 60 * 60
+
+# Content whose metadata was refreshed more recently than this is skipped
+METADATA_REFRESH_INTERVAL = timedelta(days=7)
+
+# Source metadata fetchers, keyed by content source; a refresh never re-embeds content
+METADATA_FETCHERS = {
+    'youtube': lambda content: content_processor.fetch_youtube_metadata(content.url),
+    'arxiv': lambda content: content_processor.fetch_arxiv_metadata(content.source_id)
+}
+
+# Keywords whose presence in title or description suggests a difficulty level
+BEGINNER_KEYWORDS = (
+    'introduction', 'basics', 'getting started', 'beginner', 'tutorial',
+    'fundamentals', 'overview', 'primer', '101'
+)
+ADVANCED_KEYWORDS = (
+    'advanced', 'expert', 'deep dive', 'optimization', 'architecture',
+    'performance', 'scalability', 'research', 'cutting-edge'
+)
+
 def get_db_session() -> Session:
     """Get database session for Celery tasks"""
-    return SessionLocal()
+    return ScopedSession()
+
+# Global Redis client for task bookkeeping
+_redis_client = None
+
+def get_redis_client() -> redis.Redis:
+    """Get Redis client for Celery task bookkeeping (singleton per worker process)"""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.from_url(get_settings().REDIS_URL)
+    return _redis_client
+
+def _poll_backoff_active(task_name: str) -> bool:
+    """Check whether a periodic task is inside its idle backoff window"""
+    try:
+        return bool(get_redis_client().exists(f"poll_backoff:{task_name}:skip"))
+    except redis.RedisError as e:
+        logger.warning("Could not read poll backoff state", task=task_name, error=str(e))
+        return False
+
+def _record_poll_result(task_name: str, found_work: bool):
+    """Reset the idle backoff after useful work, otherwise widen the skip window"""
+    key = f"poll_backoff:{task_name}"
+    try:
+        client = get_redis_client()
+        if found_work:
+            client.delete(f"{key}:idle", f"{key}:skip")
+            return
+        
+        idle_polls = client.incr(f"{key}:idle")
+        skip_seconds = min(POLL_BACKOFF_BASE_SECONDS * 2 ** min(idle_polls - 1, 16), POLL_BACKOFF_MAX_SECONDS)
+        client.set(f"{key}:skip", 1, ex=skip_seconds)
+    except redis.RedisError as e:
+        logger.warning("Could not update poll backoff state", task=task_name, error=str(e))
 
 @celery_app.task(bind=True, max_retries=3, default_retry_delay=60)
 def process_content_embedding(self, content_id: str) -> Dict[str, str]:
@@ -33,23 +105,27 @@ def process_content_embedding(self, content_id: str) -> Dict[str, str]:
     
     db = get_db_session()
     try:
-        # Get content item
-        content = db.query(ContentItem).filter(ContentItem.id == content_id).first()
+        # Get content text and whether it needs an embedding, without loading any stored vector
+        content = db.query(
+            ContentItem.title,
+            ContentItem.description,
+            EMBEDDING_MISSING.label("embedding_missing")
+        ).filter(ContentItem.id == content_id).first()
         if not content:
             logger.error("Content not found", content_id=content_id)
             return {"status": "error", "message": "Content not found"}
         
         # Skip if embedding already exists
-        if content.embedding:
+        if not content.embedding_missing:
             logger.info("Embedding already exists", content_id=content_id)
             return {"status": "skipped", "message": "Embedding already exists"}
         
         # Generate embedding
         text_content = f"{content.title} {content.description or ''}"
-        embedding = content_processor.generate_embedding(text_content)
+        embedding = asyncio.run(content_processor.generate_embedding(text_content))
         
         # Update content with embedding
-        content.embedding = embedding
+        db.execute(update(ContentItem).where(ContentItem.id == content_id).values(embedding=embedding))
         db.commit()
         
         logger.info("Embedding generated successfully", content_id=content_id)
@@ -68,6 +144,54 @@ def process_content_embedding(self, content_id: str) -> Dict[str, str]:
     finally:
         db.close()
 
+def enqueue_content_embeddings(content_ids: List[str]):
+    """Enqueue embedding tasks for many content items through one broker producer"""
+    if not content_ids:
+        return None
+    return group(process_content_embedding.s(content_id) for content_id in content_ids).apply_async()
+
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=60)
+def batch_process_content_embeddings(self, content_ids: List[str], batch_size: int = 32) -> Dict[str, Any]:
+    """Generate embeddings for many content items with batched model calls"""
+    logger.info("Batch processing content embeddings", 
+               total_items=len(content_ids), batch_size=batch_size, task_id=self.request.id)
+    
+    db = get_db_session()
+    try:
+        # Load the text of all requested items still missing an embedding in one query
+        content_items = db.query(
+            ContentItem.id,
+            ContentItem.title,
+            ContentItem.description
+        ).filter(ContentItem.id.in_(content_ids), EMBEDDING_MISSING).all()
+        if not content_items:
+            return {"status": "skipped", "updated_count": 0}
+        
+        texts = [f"{content.title} {content.description or ''}" for content in content_items]
+        embeddings = asyncio.run(_generate_embeddings_in_batches(texts, batch_size))
+        
+        # Write all embeddings back in a single bulk update
+        db.bulk_update_mappings(ContentItem, [
+            {"id": content.id, "embedding": embedding}
+            for content, embedding in zip(content_items, embeddings)
+        ])
+        db.commit()
+        
+        logger.info("Batch embeddings generated successfully", updated_count=len(content_items))
+        return {"status": "success", "updated_count": len(content_items)}
+        
+    except Exception as e:
+        logger.error("Batch embedding generation failed", error=str(e), total_items=len(content_ids))
+        
+        try:
+            self.retry(countdown=60 * (self.request.retries + 1))
+        except self.MaxRetriesExceededError:
+            logger.error("Max retries exceeded for batch embedding generation", total_items=len(content_ids))
+            return {"status": "failed", "message": str(e)}
+    
+    finally:
+        db.close()
+
 @celery_app.task(bind=True, max_retries=3, default_retry_delay=60)
 def batch_process_youtube_playlist(self, playlist_url: str, user_id: str) -> Dict[str, str]:
     """Process entire YouTube playlist"""
@@ -104,38 +228,30 @@ def batch_update_content_metadata(self, source: str) -> Dict[str, Any]:
     
     db = get_db_session()
     try:
-        # Get content items that need metadata updates
+        if source not in METADATA_FETCHERS:
+            logger.warning("No metadata fetcher for source", source=source)
+            return {"status": "success", "updated_count": 0}
+        
+        # Claim content items whose metadata has not been refreshed recently;
+        # rows locked by a concurrent run are skipped rather than fetched twice
+        refresh_cutoff = datetime.utcnow() - METADATA_REFRESH_INTERVAL
         content_items = db.query(ContentItem).filter(
             ContentItem.source == source,
-            ContentItem.status == 'approved'
-        ).limit(100).all()
+            ContentItem.status == 'approved',
+            ContentItem.source_id.isnot(None),
+            or_(
+                ContentItem.last_metadata_refresh_at.is_(None),
+                ContentItem.last_metadata_refresh_at < refresh_cutoff
+            )
+        ).order_by(ContentItem.id).limit(100).with_for_update(skip_locked=True).all()
         
-        updated_count = 0
-        for content in content_items:
-            try:
-                if source == 'youtube' and content.source_id:
-                    # Re-fetch YouTube metadata
-                    updated_data = content_processor.process_youtube_content(content.url)
-                    
-                    # Update metadata
-                    content.content_metadata = updated_data["metadata"]
-                    content.topics = updated_data["topics"]
-                    updated_count += 1
-                    
-                elif source == 'arxiv' and content.source_id:
-                    # Re-fetch arXiv metadata
-                    updated_data = content_processor.process_arxiv_content(content.source_id)
-                    
-                    # Update metadata
-                    content.metadata = updated_data["metadata"]
-                    content.topics = updated_data["topics"]
-                    updated_count += 1
-                
-            except Exception as e:
-                logger.warning("Failed to update content metadata", 
-                             content_id=str(content.id), error=str(e))
-                continue
+        # Re-fetch metadata on a single event loop for the whole batch
+        updated_rows = asyncio.run(_refresh_content_metadata(source, content_items))
+        updated_count = len(updated_rows)
         
+        # Write all refreshed rows back in a single bulk update
+        if updated_rows:
+            db.bulk_update_mappings(ContentItem, updated_rows)
         db.commit()
         
         logger.info("Batch metadata update completed", 
@@ -159,33 +275,33 @@ def cleanup_failed_uploads(self) -> Dict[str, Any]:
     """Clean up failed or orphaned file uploads"""
     logger.info("Cleaning up failed uploads")
     
+    if _poll_backoff_active(self.name):
+        logger.info("Upload cleanup skipped during idle backoff")
+        return {"status": "skipped", "cleaned_count": 0}
+    
     db = get_db_session()
     try:
         cutoff_time = datetime.utcnow() - timedelta(hours=24)
         
-        failed_uploads = db.query(ContentItem).filter(
-            ContentItem.source == 'upload',
-            ContentItem.status == 'pending',
-            ContentItem.created_at < cutoff_time
+        # Delete stale uploads in one statement, returning their file paths
+        deleted_uploads = db.execute(
+            delete(ContentItem)
+            .where(
+                ContentItem.source == 'upload',
+                ContentItem.status == 'pending',
+                ContentItem.created_at < cutoff_time
+            )
+            .returning(ContentItem.id, ContentItem.url)
+            # Nothing is loaded in the session, so skip matching deleted rows against it
+            .execution_options(synchronize_session=False)
         ).all()
+        db.commit()
         
-        cleaned_count = 0
-        for content in failed_uploads:
-            try:
-                # Remove file if it exists
-                if content.url and os.path.exists(content.url):
-                    os.remove(content.url)
-                
-                # Remove database record
-                db.delete(content)
-                cleaned_count += 1
-                
-            except Exception as e:
-                logger.warning("Failed to clean up upload", 
-                             content_id=str(content.id), error=str(e))
-                continue
+        cleaned_count = len(deleted_uploads)
         
-        db.commit()
+        # Remove the uploaded files concurrently now that their records are gone
+        _remove_upload_files(deleted_uploads)
+        _record_poll_result(self.name, found_work=cleaned_count > 0)
         
         logger.info("Upload cleanup completed", cleaned_count=cleaned_count)
         return {"status": "success", "cleaned_count": cleaned_count}
@@ -202,13 +318,19 @@ def generate_content_difficulty_levels(self) -> Dict[str, Any]:
     """Analyze content and assign difficulty levels"""
     logger.info("Generating content difficulty levels")
     
+    if _poll_backoff_active(self.name):
+        logger.info("Difficulty level generation skipped during idle backoff")
+        return {"status": "skipped", "updated_count": 0}
+    
     db = get_db_session()
     try:
-        # Get content items without difficulty levels
-        content_items = db.query(ContentItem).filter(
+        # Claim content items without difficulty levels; rows locked by other workers are skipped
+        content_items = db.query(ContentItem).options(
+            load_only(ContentItem.title, ContentItem.description)
+        ).filter(
             ContentItem.difficulty_level.is_(None),
             ContentItem.status == 'approved'
-        ).limit(50).all()
+        ).order_by(ContentItem.id).limit(50).with_for_update(skip_locked=True).all()
         
         updated_count = 0
         for content in content_items:
@@ -223,6 +345,7 @@ def generate_content_difficulty_levels(self) -> Dict[str, Any]:
                 continue
         
         db.commit()
+        _record_poll_result(self.name, found_work=bool(content_items))
         
         logger.info("Difficulty level generation completed", updated_count=updated_count)
         return {"status": "success", "updated_count": updated_count}
@@ -234,24 +357,70 @@ def generate_content_difficulty_levels(self) -> Dict[str, Any]:
     finally:
         db.close()
 
-def _analyze_content_difficulty(content: ContentItem) -> str:
-    """Analyze content and determine difficulty level"""
-    # Simple heuristic based on content characteristics
+def _remove_upload_files(deleted_uploads: List[Tuple[str, Optional[str]]]) -> None:
+    """Remove the files of deleted upload records in a thread pool"""
     
-    beginner_keywords = [
-        'introduction', 'basics', 'getting started', 'beginner', 'tutorial',
-        'fundamentals', 'overview', 'primer', '101'
-    ]
+    def remove_file(upload: Tuple[str, Optional[str]]):
+        content_id, path = upload
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Failed to remove upload file", content_id=str(content_id), error=str(e))
+    
+    uploads_with_files = [upload for upload in deleted_uploads if upload[1]]
+    if not uploads_with_files:
+        return
     
-    advanced_keywords = [
-        'advanced', 'expert', 'deep dive', 'optimization', 'architecture',
-        'performance', 'scalability', 'research', 'cutting-edge'
-    ]
+    with ThreadPoolExecutor(max_workers=UPLOAD_CLEANUP_WORKERS) as executor:
+        list(executor.map(remove_file, uploads_with_files))
+
+async def _generate_embeddings_in_batches(texts: List[str], batch_size: int) -> List[List[float]]:
+    """Generate embeddings for texts, one model call per chunk of batch_size"""
+    embeddings = []
+    for i in range(0, len(texts), batch_size):
+        embeddings.extend(await content_processor.generate_embeddings(texts[i:i + batch_size]))
+    return embeddings
+
+async def _refresh_content_metadata(source: str, content_items: List[ContentItem]) -> List[Dict[str, Any]]:
+    """Re-fetch source metadata for content items concurrently, returning bulk update rows"""
+    fetch_metadata = METADATA_FETCHERS[source]
+    semaphore = asyncio.Semaphore(METADATA_REFRESH_CONCURRENCY)
     
+    async def refresh(content: ContentItem) -> Dict[str, Any]:
+        async with semaphore:
+            updated_data = await fetch_metadata(content)
+        
+        return {
+            "id": content.id,
+            "content_metadata": updated_data["metadata"],
+            "topics": updated_data["topics"],
+            "last_metadata_refresh_at": datetime.utcnow()
+        }
+    
+    results = await asyncio.gather(
+        *(refresh(content) for content in content_items),
+        return_exceptions=True
+    )
+    
+    updated_rows = []
+    for content, result in zip(content_items, results):
+        if isinstance(result, Exception):
+            logger.warning("Failed to update content metadata", 
+                         content_id=str(content.id), error=str(result))
+        else:
+            updated_rows.append(result)
+    
+    return updated_rows
+
+def _analyze_content_difficulty(content: ContentItem) -> str:
+    """Analyze content and determine difficulty level"""
+    # Simple heuristic based on content characteristics
     text_content = f"{content.title} {content.description or ''}".lower()
     
-    beginner_score = sum(1 for keyword in beginner_keywords if keyword in text_content)
-    advanced_score = sum(1 for keyword in advanced_keywords if keyword in text_content)
+    beginner_score = sum(map(text_content.__contains__, BEGINNER_KEYWORDS))
+    advanced_score = sum(map(text_content.__contains__, ADVANCED_KEYWORDS))
     
     if beginner_score > advanced_score:
         return 'beginner'
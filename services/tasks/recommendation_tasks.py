@@ -7,11 +7,11 @@ Created: 2025-09-05
 Purpose: Background tasks for recommendation processing and user preference updates
 """
 
-from celery import current_task
+from celery import chain, current_task
 from sqlalchemy.orm import Session
 import structlog
 from services.celery_app import celery_app
-from services.database import SessionLocal
+from services.database import ScopedSession
 from services.models import User, UserPreferences, ContentItem, UserInteraction, Recommendation
 from services.exceptions import ContentProcessingError
 
@@ -19,7 +19,7 @@ logger = structlog.get_logger()
 
 def get_db_session():
     """Get database session for Celery tasks"""
-    return SessionLocal()
+    return ScopedSession()
 
 @celery_app.task(bind=True, max_retries=2, default_retry_delay=120)
 def update_user_preferences_from_feedback(self, user_id: str, interaction_data: dict):
@@ -93,4 +93,11 @@ def generate_user_recommendations(self, user_id: str, limit: int = 20):
     finally:
         db.close()
 
+def refresh_recommendations_from_feedback(user_id: str, interaction_data: dict, limit: int = 20):
+    """Update preferences from feedback, then regenerate recommendations once that has finished"""
+    return chain(
+        update_user_preferences_from_feedback.si(user_id, interaction_data),
+        generate_user_recommendations.si(user_id, limit)
+    ).apply_async()
+
 # Updated 2025-09-05: Basic recommendation processing tasks
\ No newline at end of file
@@ -9,33 +9,43 @@ Purpose: Basic unit testing framework configuration
 
 import pytest
 import asyncio
-import os
+import functools
+import re
 import tempfile
+import zlib
+from types import MappingProxyType
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Generator
 from unittest.mock import Mock, AsyncMock, patch
+import numpy as np
 from faker import Faker
 
 fake = Faker()
+fake.seed_instance(0)
 
 # Basic fixtures without external dependencies
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def sample_user_data():
-    """Provide sample user data for testing"""
-    return {
+    """Provide read-only sample user data shared across the session"""
+    return MappingProxyType({
         'email': fake.email(),
         'full_name': fake.name(),
         'role': 'learner',
         'is_active': True,
         'email_verified': True,
         'created_at': datetime.utcnow()
-    }
+    })
 
 @pytest.fixture(scope="function")
+def sample_user_data_mut(sample_user_data):
+    """Provide a mutable copy of the sample user data"""
+    return dict(sample_user_data)
+
+@pytest.fixture(scope="session")
 def sample_content_data():
-    """Provide sample content data for testing"""
-    return {
+    """Provide read-only sample content data shared across the session"""
+    return MappingProxyType({
         'title': fake.sentence(nb_words=4),
         'description': fake.text(max_nb_chars=200),
         'content_type': 'video',
@@ -47,34 +57,31 @@ def sample_content_data():
         'topics': ['AI', 'Machine Learning'],
         'language': 'en',
         'status': 'approved'
-    }
+    })
 
 @pytest.fixture(scope="function")
-def mock_external_apis():
-    """Mock external APIs for testing"""
-    mocks = {
-        'youtube_api': Mock(),
-        'arxiv_api': Mock(),
-        'openai_api': AsyncMock()
-    }
-    
-    # Configure YouTube API mock
-    mocks['youtube_api'].json.return_value = {
-        'items': [{
-            'snippet': {
-                'title': 'Test Video',
-                'description': 'Test video description',
-                'tags': ['test', 'education'],
-                'channelTitle': 'Test Channel',
-                'publishedAt': '2023-01-01T00:00:00Z'
-            },
-            'contentDetails': {'duration': 'PT15M33S'},
-            'statistics': {'viewCount': '1000', 'likeCount': '100'}
-        }]
-    }
-    
-    # Configure arXiv API mock
-    mocks['arxiv_api'].content = '''<?xml version="1.0" encoding="UTF-8"?>
+def sample_content_data_mut(sample_content_data):
+    """Provide a mutable copy of the sample content data"""
+    return dict(sample_content_data)
+
+# Canned external API payloads, built once and shared by every mock_external_apis call
+FAKE_EMBEDDING = (0.1,) * 1536
+
+YOUTUBE_API_PAYLOAD = {
+    'items': [{
+        'snippet': {
+            'title': 'Test Video',
+            'description': 'Test video description',
+            'tags': ['test', 'education'],
+            'channelTitle': 'Test Channel',
+            'publishedAt': '2023-01-01T00:00:00Z'
+        },
+        'contentDetails': {'duration': 'PT15M33S'},
+        'statistics': {'viewCount': '1000', 'likeCount': '100'}
+    }]
+}
+
+ARXIV_API_PAYLOAD = b'''<?xml version="1.0" encoding="UTF-8"?>
     <feed xmlns="http://www.w3.org/2005/Atom">
         <entry>
             <title>Test Paper</title>
@@ -82,13 +89,25 @@ def mock_external_apis():
             <author><name>Test Author</name></author>
             <category term="cs.AI"/>
         </entry>
-    </feed>'''.encode()
-    
-    # Configure OpenAI API mock
-    mocks['openai_api'].Embedding.acreate.return_value = {
-        'data': [{'embedding': [0.1] * 1536}]
+    </feed>'''
+
+OPENAI_EMBEDDING_PAYLOAD = {
+    'data': [{'embedding': FAKE_EMBEDDING}]
+}
+
+@pytest.fixture(scope="function")
+def mock_external_apis():
+    """Mock external APIs for testing"""
+    mocks = {
+        'youtube_api': Mock(),
+        'arxiv_api': Mock(),
+        'openai_api': AsyncMock()
     }
     
+    mocks['youtube_api'].json.return_value = YOUTUBE_API_PAYLOAD
+    mocks['arxiv_api'].content = ARXIV_API_PAYLOAD
+    mocks['openai_api'].Embedding.acreate.return_value = OPENAI_EMBEDDING_PAYLOAD
+    
     return mocks
 
 @pytest.fixture(scope="function")
@@ -128,38 +147,68 @@ def benchmark_config():
         'warmup_iterations': 2
     }
 
-@pytest.fixture(scope="function")
+PERFORMANCE_DATASET_SIZES = {
+    'small_dataset': {
+        'users': 10,
+        'content_items': 50,
+        'interactions': 100
+    },
+    'medium_dataset': {
+        'users': 100,
+        'content_items': 500,
+        'interactions': 1000
+    },
+    'large_dataset': {
+        'users': 1000,
+        'content_items': 5000,
+        'interactions': 10000
+    }
+}
+
+@functools.lru_cache(maxsize=None)
+def build_performance_dataset(size_name: str) -> Dict[str, np.ndarray]:
+    """Materialize a performance dataset as NumPy arrays, once per size"""
+    sizes = PERFORMANCE_DATASET_SIZES[size_name]
+    rng = np.random.default_rng(seed=0)
+    
+    users = np.zeros(sizes['users'], dtype=[('id', 'i8'), ('email', 'U32')])
+    users['id'] = np.arange(sizes['users'])
+    users['email'] = np.char.add(np.char.add('user', users['id'].astype('U10')), '@example.com')
+    
+    content_items = np.zeros(sizes['content_items'], dtype=[('id', 'i8'), ('duration_minutes', 'i4')])
+    content_items['id'] = np.arange(sizes['content_items'])
+    content_items['duration_minutes'] = rng.integers(5, 121, size=sizes['content_items'])
+    
+    # Each interaction row is (user index, content item index)
+    interactions = np.column_stack((
+        rng.integers(0, sizes['users'], size=sizes['interactions']),
+        rng.integers(0, sizes['content_items'], size=sizes['interactions'])
+    )).astype(np.int32)
+    
+    return {'users': users, 'content_items': content_items, 'interactions': interactions}
+
+@pytest.fixture(scope="session")
 def performance_test_data():
     """Generate test data for performance testing"""
-    return {
-        'small_dataset': {
-            'users': 10,
-            'content_items': 50,
-            'interactions': 100
-        },
-        'medium_dataset': {
-            'users': 100,
-            'content_items': 500,
-            'interactions': 1000
-        },
-        'large_dataset': {
-            'users': 1000,
-            'content_items': 5000,
-            'interactions': 10000
-        }
-    }
+    return PERFORMANCE_DATASET_SIZES
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
+def performance_dataset_arrays():
+    """Provide a cached builder for performance datasets as NumPy arrays"""
+    return build_performance_dataset
+
+@pytest.fixture(scope="session")
 def test_data_generators():
     """Provide data generators for testing"""
+    # Bind provider methods once so each call skips Faker's proxy lookup
     return {
-        'email': lambda: fake.email(),
-        'name': lambda: fake.name(),
-        'password': lambda: fake.password(length=12, special_chars=True, digits=True, upper_case=True, lower_case=True),
-        'url': lambda: fake.url(),
+        'email': fake.email,
+        'name': fake.name,
+        'password': functools.partial(fake.password, length=12, special_chars=True, digits=True, upper_case=True, lower_case=True),
+        'url': fake.url,
         'text': lambda length=100: fake.text(max_nb_chars=length),
-        'uuid': lambda: fake.uuid4(),
-        'datetime': lambda: fake.date_time_between(start_date='-1y', end_date='now'),
+        'uuid': fake.uuid4,
+        'datetime': functools.partial(fake.date_time_between, start_date='-1y', end_date='now'),
         'integer': lambda min_val=1, max_val=100: fake.random_int(min=min_val, max=max_val),
         'float': lambda min_val=0.0, max_val=1.0: fake.random.uniform(min_val, max_val)
     }
@@ -207,41 +256,44 @@ def pytest_configure(config):
     config.addinivalue_line("markers", "api: API endpoint tests")
     config.addinivalue_line("markers", "models: Database model tests")
     config.addinivalue_line("markers", "fixtures: Tests that use complex fixtures")
+    
+    # Give each pytest-xdist worker its own deterministic Faker stream
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput is not None:
+        fake.seed_instance(zlib.crc32(workerinput["workerid"].encode()))
+
+# Directory names that imply a test level, checked in priority order
+_PATH_MARKERS = ("unit", "integration", "e2e")
+
+# Test name fragments and the marker each implies
+_NAME_MARKERS = {
+    "async": "asyncio",
+    "property": "property",
+    "auth": "auth",
+    "security": "security",
+    "performance": "performance",
+    "benchmark": "performance",
+    "slow": "slow",
+}
+_NAME_MARKER_PATTERN = re.compile("|".join(_NAME_MARKERS))
 
 def pytest_collection_modifyitems(config, items):
     """Modify test collection to add markers based on test location and name"""
     for item in items:
         # Add markers based on test file location
-        if "unit" in str(item.fspath):
-            item.add_marker(pytest.mark.unit)
-        elif "integration" in str(item.fspath):
-            item.add_marker(pytest.mark.integration)
-        elif "e2e" in str(item.fspath):
-            item.add_marker(pytest.mark.e2e)
+        path_parts = set(item.path.parts)
+        for marker in _PATH_MARKERS:
+            if marker in path_parts:
+                item.add_marker(marker)
+                break
         
         # Add markers based on test name patterns
-        if "async" in item.name:
-            item.add_marker(pytest.mark.asyncio)
-        if "property" in item.name:
-            item.add_marker(pytest.mark.property)
-        if "auth" in item.name:
-            item.add_marker(pytest.mark.auth)
-        if "security" in item.name:
-            item.add_marker(pytest.mark.security)
-        if "performance" in item.name or "benchmark" in item.name:
-            item.add_marker(pytest.mark.performance)
-        if "slow" in item.name:
-            item.add_marker(pytest.mark.slow)
+        for marker in {_NAME_MARKERS[match] for match in _NAME_MARKER_PATTERN.findall(item.name)}:
+            item.add_marker(marker)
 
 @pytest.fixture(autouse=True)
-def setup_test_environment():
+def setup_test_environment(monkeypatch):
     """Automatically set up test environment for each test"""
-    # Set test environment variables
-    os.environ["TESTING"] = "true"
-    os.environ["LOG_LEVEL"] = "WARNING"
-    
-    yield
-    
-    # Cleanup after test
-    if "TESTING" in os.environ:
-        del os.environ["TESTING"]
\ No newline at end of file
+    # Set test environment variables; monkeypatch restores them after the test
+    monkeypatch.setenv("TESTING", "true")
+    monkeypatch.setenv("LOG_LEVEL", "WARNING")
\ No newline at end of file
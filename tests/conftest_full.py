@@ -9,61 +9,146 @@ Purpose: Enhanced unit testing framework configuration
 """
 
 import pytest
+import asyncio
+import functools
+import itertools
 import os
+import re
+from types import MappingProxyType, SimpleNamespace
 from datetime import datetime, timedelta
+from collections.abc import Mapping
 from typing import Dict, List, Any, Optional, Generator
 from unittest.mock import Mock, AsyncMock, patch
 from faker import Faker
-from hypothesis import settings, Verbosity
 
-# Import application components
-from services.auth import AuthService
-from services.content_processing import ContentProcessor
-from services.security import SecurityValidator, InputSanitizer
-from services.database import get_db_session, create_tables
-from services.models import User, ContentItem, UserPreferences
-from services.exceptions import ValidationError, AuthenticationError
+try:
+    from hypothesis import settings, Verbosity
+except ImportError:
+    settings = None
 
+# Application components are imported inside the fixtures that need them,
+# so collection does not pay for the service and model import graph
+
+Faker.seed(0)
 fake = Faker()
 
-# Hypothesis configuration for property-based testing
-settings.register_profile("default", max_examples=50, deadline=None, verbosity=Verbosity.normal)
-settings.register_profile("ci", max_examples=100, deadline=None, verbosity=Verbosity.quiet)
-settings.register_profile("dev", max_examples=20, deadline=None, verbosity=Verbosity.verbose)
+# Factory rows only need to be unique, so a counter replaces Faker on the hot path
+_id_counter = itertools.count()
 
-# Load profile based on environment
-profile = os.getenv("HYPOTHESIS_PROFILE", "default")
-settings.load_profile(profile)
+# Topic and domain pairs are cycled rather than sampled through Faker per row
+_topic_pairs = itertools.cycle(itertools.combinations(
+    ("AI", "Machine Learning", "Python", "Web Development"), 2
+))
+_domain_pairs = itertools.cycle(itertools.combinations(
+    ("AI", "Web Development", "Data Science", "Mobile Development"), 2
+))
+
+# Hypothesis configuration for property-based testing
+HYPOTHESIS_SETTINGS = None
+if settings is not None:
+    settings.register_profile("default", max_examples=50, deadline=None, verbosity=Verbosity.normal)
+    settings.register_profile("ci", max_examples=100, deadline=None, verbosity=Verbosity.quiet)
+    settings.register_profile("dev", max_examples=20, deadline=None, verbosity=Verbosity.verbose)
+    
+    # Load profile based on environment
+    profile = os.getenv("HYPOTHESIS_PROFILE", "default")
+    settings.load_profile(profile)
+    HYPOTHESIS_SETTINGS = settings.get_profile(profile)
 
 @pytest.fixture(scope="session")
 def hypothesis_settings():
     """Provide Hypothesis settings for tests"""
-    return settings.get_profile(profile)
+    return HYPOTHESIS_SETTINGS
 
 # Database fixtures
 
 @pytest.fixture(scope="session")
 def test_database_url():
-    """Provide test database URL"""
-    return os.getenv("TEST_DATABASE_URL", "sqlite:///test.db")
+    """Provide test database URL, defaulting to a per-process in-memory SQLite database"""
+    from sqlalchemy.engine import make_url
+    
+    url = make_url(os.getenv("TEST_DATABASE_URL", "sqlite+pysqlite:///:memory:"))
+    
+    # In-memory databases are already private to each xdist worker process; file-backed
+    # SQLite databases get a per-worker file so parallel workers do not share one lock
+    worker = os.getenv("PYTEST_XDIST_WORKER")
+    if worker and url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:"):
+        root, ext = os.path.splitext(url.database)
+        url = url.set(database=f"{root}_{worker}{ext}")
+    
+    return url.render_as_string(hide_password=False)
+
+@pytest.fixture(scope="session")
+def db_engine(test_database_url):
+    """Provide a database engine with the schema created once per session"""
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.engine import make_url
+    from sqlalchemy.pool import StaticPool
+    from services.models import Base
+    
+    url = make_url(test_database_url)
+    in_memory = url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+    
+    if in_memory:
+        # Every connection must share the single in-memory database
+        engine = create_engine(
+            url,
+            echo=False,
+            poolclass=StaticPool,
+            connect_args={"check_same_thread": False}
+        )
+    else:
+        engine = create_engine(url, echo=False, pool_pre_ping=True)
+    
+    if engine.dialect.name == "sqlite":
+        # pysqlite's implicit transactions break SAVEPOINT; let SQLAlchemy emit BEGIN itself
+        @event.listens_for(engine, "connect")
+        def _configure_sqlite_connection(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+            if not in_memory:
+                # Test data is disposable, so skip fsyncs on file-backed databases
+                dbapi_connection.execute("PRAGMA synchronous=OFF")
+                dbapi_connection.execute("PRAGMA journal_mode=MEMORY")
+        
+        @event.listens_for(engine, "begin")
+        def _emit_begin(connection):
+            connection.exec_driver_sql("BEGIN")
+    
+    Base.metadata.create_all(bind=engine)
+    
+    yield engine
+    engine.dispose()
+
+@pytest.fixture(scope="module")
+def _module_connection(db_engine):
+    """Provide a connection whose outer transaction spans the test module"""
+    connection = db_engine.connect()
+    transaction = connection.begin()
+    
+    try:
+        yield connection
+    finally:
+        transaction.rollback()
+        connection.close()
 
 @pytest.fixture(scope="function")
-def db_session(test_database_url):
-    """Provide database session for tests"""
-    from sqlalchemy import create_engine
+def db_session(_module_connection):
+    """Provide database session for tests, rolled back when the test ends"""
     from sqlalchemy.orm import sessionmaker
     
-    engine = create_engine(test_database_url, echo=False)
-    create_tables(engine)
+    # Module-scoped seed rows sit below this checkpoint and survive its rollback
+    checkpoint = _module_connection.begin_nested()
     
-    SessionLocal = sessionmaker(bind=engine)
+    # Session commits only release SAVEPOINTs inside the checkpoint
+    SessionLocal = sessionmaker(bind=_module_connection, join_transaction_mode="create_savepoint")
     session = SessionLocal()
     
     try:
         yield session
     finally:
-        session.rollback()
         session.close()
+        if checkpoint.is_active:
+            checkpoint.rollback()
 
 @pytest.fixture(scope="function")
 def async_db_session(db_session):
@@ -73,60 +158,87 @@ def async_db_session(db_session):
 
 # Authentication fixtures
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def auth_service():
     """Provide AuthService instance for testing"""
+    from services.auth import AuthService
+    
     return AuthService()
 
+@functools.lru_cache(maxsize=256)
+def cached_password_hash(auth_service, password: str) -> str:
+    """Hash each distinct fixture password once per session"""
+    # Argon2 is deliberately slow; any valid hash still verifies, so reusing one is safe here
+    return auth_service.hash_password(password)
+
+def _build_user(
+    session,
+    auth_service,
+    email: Optional[str] = None,
+    password: Optional[str] = None,
+    role: str = "learner",
+    is_active: bool = True,
+    email_verified: bool = True,
+    refresh: bool = False
+):
+    """Create and flush a test user in the given session"""
+    from services.models import User
+    
+    n = next(_id_counter)
+    if email is None:
+        email = f"factory-user-{n}@example.com"
+    if password is None:
+        password = "TestPassword123!"
+    
+    password_hash = cached_password_hash(auth_service, password) if password else None
+    
+    user = User(
+        email=email.lower(),
+        full_name=f"User {n}",
+        password_hash=password_hash,
+        role=role,
+        is_active=is_active,
+        email_verified=email_verified,
+        created_at=datetime.utcnow()
+    )
+    
+    # Flushing assigns the primary key; the test transaction is rolled back anyway
+    session.add(user)
+    session.flush()
+    if refresh:
+        session.refresh(user)
+    
+    return user
+
 @pytest.fixture(scope="function")
-def sample_user_factory(db_session):
+def sample_user_factory(db_session, auth_service):
     """Factory for creating test users"""
-    created_users = []
-    
-    def _create_user(
-        email: Optional[str] = None,
-        password: Optional[str] = None,
-        role: str = "learner",
-        is_active: bool = True,
-        email_verified: bool = True
-    ) -> User:
-        if email is None:
-            email = fake.email()
-        if password is None:
-            password = "TestPassword123!"
-        
-        auth_service = AuthService()
-        password_hash = auth_service.hash_password(password) if password else None
-        
-        user = User(
-            email=email.lower(),
-            full_name=fake.name(),
-            password_hash=password_hash,
-            role=role,
-            is_active=is_active,
-            email_verified=email_verified,
-            created_at=datetime.utcnow()
-        )
-        
-        db_session.add(user)
-        db_session.commit()
-        db_session.refresh(user)
-        created_users.append(user)
-        
-        return user
+    return functools.partial(_build_user, db_session, auth_service)
+
+class LazyTokenMap(Mapping):
+    """Mapping of user type to access token that signs each token on first access"""
     
-    yield _create_user
+    def __init__(self, auth_service, users: Dict[str, Any]):
+        self._auth_service = auth_service
+        self._users = users
+        self._tokens = {}
     
-    # Cleanup
-    for user in created_users:
-        db_session.delete(user)
-    db_session.commit()
+    def __getitem__(self, user_type: str) -> str:
+        if user_type not in self._tokens:
+            user = self._users[user_type]
+            token_data = {"sub": str(user.id), "email": user.email}
+            self._tokens[user_type] = self._auth_service.create_access_token(token_data)
+        return self._tokens[user_type]
+    
+    def __iter__(self):
+        return iter(self._users)
+    
+    def __len__(self) -> int:
+        return len(self._users)
 
 @pytest.fixture(scope="function")
-def authentication_scenario_complex(db_session, sample_user_factory):
+def authentication_scenario_complex(db_session, sample_user_factory, auth_service):
     """Complex authentication scenario with various user states"""
-    auth_service = AuthService()
-    
     users = {
         'active_verified': sample_user_factory(
             email="active@example.com",
@@ -156,17 +268,13 @@ def authentication_scenario_complex(db_session, sample_user_factory):
             email_verified=True
         )
     }
+    db_session.commit()
     
-    # Generate tokens for active users with passwords
-    tokens = {}
-    for user_type, user in users.items():
-        if user.is_active and user.password_hash:
-            try:
-                token_data = {"sub": str(user.id), "email": user.email}
-                tokens[user_type] = auth_service.create_access_token(token_data)
-            except Exception:
-                # Skip token creation if it fails
-                pass
+    # Tokens for active users with passwords, signed only when a test reads them
+    tokens = LazyTokenMap(auth_service, {
+        user_type: user for user_type, user in users.items()
+        if user.is_active and user.password_hash
+    })
     
     return {
         'users': users,
@@ -176,87 +284,77 @@ def authentication_scenario_complex(db_session, sample_user_factory):
 
 # Content processing fixtures
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def content_processor():
-    """Provide ContentProcessor instance for testing"""
-    return ContentProcessor()
+    """Provide the shared ContentProcessor instance for testing"""
+    from services.content_processing import content_processor
+    
+    return content_processor
+
+def _build_content(
+    session,
+    title: Optional[str] = None,
+    content_type: str = "video",
+    source: str = "youtube",
+    difficulty_level: str = "beginner",
+    topics: Optional[List[str]] = None,
+    refresh: bool = False
+):
+    """Create and flush a test content item in the given session"""
+    from services.models import ContentItem
+    
+    n = next(_id_counter)
+    if title is None:
+        title = f"Content {n}"
+    if topics is None:
+        topics = list(next(_topic_pairs))
+    
+    content = ContentItem(
+        title=title,
+        description=f"Description for content {n}",
+        content_type=content_type,
+        source=source,
+        source_id=str(n),
+        url=f"https://example.com/content/{n}",
+        duration_minutes=30,
+        difficulty_level=difficulty_level,
+        topics=topics,
+        language="en",
+        status="approved",
+        created_at=datetime.utcnow()
+    )
+    
+    # Flushing assigns the primary key; the test transaction is rolled back anyway
+    session.add(content)
+    session.flush()
+    if refresh:
+        session.refresh(content)
+    
+    return content
 
 @pytest.fixture(scope="function")
 def content_factory(db_session):
     """Factory for creating test content items"""
-    created_content = []
-    
-    def _create_content(
-        title: Optional[str] = None,
-        content_type: str = "video",
-        source: str = "youtube",
-        difficulty_level: str = "beginner",
-        topics: Optional[List[str]] = None
-    ) -> ContentItem:
-        if title is None:
-            title = fake.sentence(nb_words=4)
-        if topics is None:
-            topics = fake.random_elements(
-                elements=["AI", "Machine Learning", "Python", "Web Development"],
-                length=2,
-                unique=True
-            )
-        
-        content = ContentItem(
-            title=title,
-            description=fake.text(max_nb_chars=200),
-            content_type=content_type,
-            source=source,
-            source_id=fake.uuid4(),
-            url=fake.url(),
-            duration_minutes=fake.random_int(min=5, max=120),
-            difficulty_level=difficulty_level,
-            topics=topics,
-            language="en",
-            status="approved",
-            created_at=datetime.utcnow()
-        )
-        
-        db_session.add(content)
-        db_session.commit()
-        db_session.refresh(content)
-        created_content.append(content)
-        
-        return content
-    
-    yield _create_content
-    
-    # Cleanup
-    for content in created_content:
-        db_session.delete(content)
-    db_session.commit()
+    return functools.partial(_build_content, db_session)
+
+# Canned external API payloads, built once and shared by every mock_external_apis call
+FAKE_EMBEDDING = (0.1,) * 1536
+
+YOUTUBE_API_PAYLOAD = {
+    'items': [{
+        'snippet': {
+            'title': 'Test Video',
+            'description': 'Test video description',
+            'tags': ['test', 'education'],
+            'channelTitle': 'Test Channel',
+            'publishedAt': '2023-01-01T00:00:00Z'
+        },
+        'contentDetails': {'duration': 'PT15M33S'},
+        'statistics': {'viewCount': '1000', 'likeCount': '100'}
+    }]
+}
 
-@pytest.fixture(scope="function")
-def mock_external_apis():
-    """Mock external APIs for testing"""
-    mocks = {
-        'youtube_api': Mock(),
-        'arxiv_api': Mock(),
-        'openai_api': AsyncMock()
-    }
-    
-    # Configure YouTube API mock
-    mocks['youtube_api'].json.return_value = {
-        'items': [{
-            'snippet': {
-                'title': 'Test Video',
-                'description': 'Test video description',
-                'tags': ['test', 'education'],
-                'channelTitle': 'Test Channel',
-                'publishedAt': '2023-01-01T00:00:00Z'
-            },
-            'contentDetails': {'duration': 'PT15M33S'},
-            'statistics': {'viewCount': '1000', 'likeCount': '100'}
-        }]
-    }
-    
-    # Configure arXiv API mock
-    mocks['arxiv_api'].content = '''<?xml version="1.0" encoding="UTF-8"?>
+ARXIV_API_PAYLOAD = b'''<?xml version="1.0" encoding="UTF-8"?>
     <feed xmlns="http://www.w3.org/2005/Atom">
         <entry>
             <title>Test Paper</title>
@@ -264,54 +362,70 @@ def mock_external_apis():
             <author><name>Test Author</name></author>
             <category term="cs.AI"/>
         </entry>
-    </feed>'''.encode()
-    
-    # Configure OpenAI API mock
-    mocks['openai_api'].Embedding.acreate.return_value = {
-        'data': [{'embedding': [0.1] * 1536}]
+    </feed>'''
+
+OPENAI_EMBEDDING_PAYLOAD = {
+    'data': [{'embedding': FAKE_EMBEDDING}]
+}
+
+@pytest.fixture(scope="function")
+def mock_external_apis():
+    """Mock external APIs for testing"""
+    # Plain namespaces where nothing inspects call history; Mock only where tests configure it
+    mocks = {
+        'youtube_api': SimpleNamespace(json=Mock(return_value=YOUTUBE_API_PAYLOAD)),
+        'arxiv_api': SimpleNamespace(content=ARXIV_API_PAYLOAD),
+        'openai_api': AsyncMock()
     }
     
+    mocks['openai_api'].Embedding.acreate.return_value = OPENAI_EMBEDDING_PAYLOAD
+    
     return mocks
 
 # Security testing fixtures
 
-@pytest.fixture(scope="function")
+# Attack payloads are read-only, so they are frozen once at import and shared
+SECURITY_TEST_DATA = MappingProxyType({
+    'sql_injection_payloads': (
+        "'; DROP TABLE users; --",
+        "' OR '1'='1' --",
+        "'; INSERT INTO users (email) VALUES ('hacker@evil.com'); --",
+        "' UNION SELECT * FROM users --",
+        "'; UPDATE users SET role='admin' WHERE email='victim@example.com'; --"
+    ),
+    'xss_payloads': (
+        "<script>alert('xss')</script>",
+        "javascript:alert('xss')",
+        "<img src=x onerror=alert('xss')>",
+        "<svg onload=alert('xss')>",
+        "';alert('xss');//"
+    ),
+    'malicious_files': (
+        MappingProxyType({'name': 'malware.exe', 'content': b'MZ\x90\x00'}),  # PE header
+        MappingProxyType({'name': 'script.js', 'content': b'eval(atob("malicious"))'}),  # Base64 eval
+        MappingProxyType({'name': 'shell.php', 'content': b'<?php system($_GET["cmd"]); ?>'})
+    ),
+    'safe_inputs': (
+        "normal@example.com",
+        "user with spaces",
+        "user123@domain.co.uk",
+        "Normal text content",
+        "Text with <b>HTML</b> tags"
+    )
+})
+
+@pytest.fixture(scope="session")
 def security_test_data():
     """Provide security test data for various attack vectors"""
-    return {
-        'sql_injection_payloads': [
-            "'; DROP TABLE users; --",
-            "' OR '1'='1' --",
-            "'; INSERT INTO users (email) VALUES ('hacker@evil.com'); --",
-            "' UNION SELECT * FROM users --",
-            "'; UPDATE users SET role='admin' WHERE email='victim@example.com'; --"
-        ],
-        'xss_payloads': [
-            "<script>alert('xss')</script>",
-            "javascript:alert('xss')",
-            "<img src=x onerror=alert('xss')>",
-            "<svg onload=alert('xss')>",
-            "';alert('xss');//"
-        ],
-        'malicious_files': [
-            {'name': 'malware.exe', 'content': b'MZ\x90\x00'},  # PE header
-            {'name': 'script.js', 'content': b'eval(atob("malicious"))'},  # Base64 eval
-            {'name': 'shell.php', 'content': b'<?php system($_GET["cmd"]); ?>'}
-        ],
-        'safe_inputs': [
-            "normal@example.com",
-            "user with spaces",
-            "user123@domain.co.uk",
-            "Normal text content",
-            "Text with <b>HTML</b> tags"
-        ]
-    }
+    return SECURITY_TEST_DATA
 
 # Learning scenario fixtures
 
 @pytest.fixture(scope="function")
 def learning_scenario_basic(db_session, sample_user_factory, content_factory):
     """Basic learning scenario with user, preferences, and content"""
+    from services.models import UserPreferences
+    
     user = sample_user_factory(email="learner@example.com")
     
     preferences = UserPreferences(
@@ -322,7 +436,6 @@ def learning_scenario_basic(db_session, sample_user_factory, content_factory):
         time_constraints={"max_duration": 60, "sessions_per_week": 3}
     )
     db_session.add(preferences)
-    db_session.commit()
     
     content_items = [
         content_factory(
@@ -341,6 +454,7 @@ def learning_scenario_basic(db_session, sample_user_factory, content_factory):
             difficulty_level="beginner"
         )
     ]
+    db_session.commit()
     
     return {
         'user': user,
@@ -348,13 +462,31 @@ def learning_scenario_basic(db_session, sample_user_factory, content_factory):
         'content_items': content_items
     }
 
-@pytest.fixture(scope="function")
-def learning_scenario_advanced(db_session, sample_user_factory, content_factory):
-    """Advanced learning scenario with multiple users and interactions"""
+def _seed_session(connection):
+    """Open a session for module-scoped seed data on the module connection"""
+    from sqlalchemy.orm import Session
+    
+    # Seeded objects keep their loaded state so they can be merged without reloading
+    return Session(bind=connection, join_transaction_mode="create_savepoint", expire_on_commit=False)
+
+def _attach_scenario(session, seeded: Dict[str, List[Any]]) -> Dict[str, List[Any]]:
+    """Give a test its own session-bound copies of seeded scenario objects"""
+    return {
+        key: [session.merge(obj, load=False) for obj in objs]
+        for key, objs in seeded.items()
+    }
+
+@pytest.fixture(scope="module")
+def _seeded_learning_scenario_advanced(_module_connection, auth_service):
+    """Build the advanced learning scenario rows once per module"""
+    from services.models import UserPreferences
+    
+    session = _seed_session(_module_connection)
+    
     users = [
-        sample_user_factory(email="beginner@example.com"),
-        sample_user_factory(email="intermediate@example.com"),
-        sample_user_factory(email="advanced@example.com")
+        _build_user(session, auth_service, email="beginner@example.com"),
+        _build_user(session, auth_service, email="intermediate@example.com"),
+        _build_user(session, auth_service, email="advanced@example.com")
     ]
     
     preferences = []
@@ -369,11 +501,9 @@ def learning_scenario_advanced(db_session, sample_user_factory, content_factory)
             preferred_content_types=["video", "article"],
             time_constraints={"max_duration": 60, "sessions_per_week": 3}
         )
-        db_session.add(pref)
+        session.add(pref)
         preferences.append(pref)
     
-    db_session.commit()
-    
     # Create diverse content
     content_items = []
     topics_by_level = {
@@ -384,10 +514,13 @@ def learning_scenario_advanced(db_session, sample_user_factory, content_factory)
     
     for level, topic_sets in topics_by_level.items():
         for topics in topic_sets:
-            content_items.append(content_factory(
+            content_items.append(_build_content(
+                session,
                 topics=topics,
                 difficulty_level=level
             ))
+    session.commit()
+    session.close()
     
     return {
         'users': users,
@@ -395,9 +528,15 @@ def learning_scenario_advanced(db_session, sample_user_factory, content_factory)
         'content_items': content_items
     }
 
+@pytest.fixture(scope="function")
+def learning_scenario_advanced(_seeded_learning_scenario_advanced, db_session):
+    """Advanced learning scenario with multiple users and interactions"""
+    # Per-test writes land inside the db_session checkpoint; the seed rows persist
+    return _attach_scenario(db_session, _seeded_learning_scenario_advanced)
+
 # Performance testing fixtures
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def benchmark_config():
     """Configuration for benchmark tests"""
     return {
@@ -407,7 +546,7 @@ def benchmark_config():
         'warmup_iterations': 2
     }
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def performance_test_data():
     """Generate test data for performance testing"""
     return {
@@ -430,18 +569,26 @@ def performance_test_data():
 
 # Async testing fixtures
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def celery_app():
     """Provide Celery app for testing"""
-    from services.celery_app import create_celery_app
+    from celery import Celery
     
-    app = create_celery_app()
+    # A standalone in-memory app, so eager test tasks never touch the production broker
+    app = Celery("headstart-test", broker="memory://", backend="cache+memory://")
     app.conf.task_always_eager = True
     app.conf.task_eager_propagates = True
     
     return app
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
+def shared_loop():
+    """Provide one event loop for eagerly executed Celery tasks to reuse"""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+@pytest.fixture(scope="session")
 def async_scenario_complex():
     """Complex async testing scenario"""
     return {
@@ -454,7 +601,7 @@ def async_scenario_complex():
 
 # Data generation fixtures
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def test_data_generators():
     """Provide data generators for testing"""
     return {
@@ -471,33 +618,34 @@ def test_data_generators():
 
 # Database scenario fixtures
 
-@pytest.fixture(scope="function")
-def database_scenario_complex(db_session, sample_user_factory, content_factory):
-    """Complex database scenario with relationships and constraints"""
+@pytest.fixture(scope="module")
+def _seeded_database_scenario_complex(_module_connection, auth_service):
+    """Build the complex database scenario rows once per module"""
+    from services.models import UserPreferences
+    
+    session = _seed_session(_module_connection)
+    
     # Create users
-    users = [sample_user_factory() for _ in range(5)]
+    users = [_build_user(session, auth_service) for _ in range(5)]
     
     # Create content items
-    content_items = [content_factory() for _ in range(10)]
+    content_items = [_build_content(session) for _ in range(10)]
     
     # Create user preferences
     preferences = []
     for user in users:
         pref = UserPreferences(
             user_id=user.id,
-            learning_domains=fake.random_elements(
-                elements=["AI", "Web Development", "Data Science", "Mobile Development"],
-                length=2,
-                unique=True
-            ),
+            learning_domains=list(next(_domain_pairs)),
             skill_levels={"AI": "beginner", "Python": "intermediate"},
             preferred_content_types=["video", "article"],
             time_constraints={"max_duration": 60, "sessions_per_week": 3}
         )
-        db_session.add(pref)
+        session.add(pref)
         preferences.append(pref)
     
-    db_session.commit()
+    session.commit()
+    session.close()
     
     return {
         'users': users,
@@ -507,9 +655,15 @@ def database_scenario_complex(db_session, sample_user_factory, content_factory):
         'recommendations': []  # Can be extended
     }
 
+@pytest.fixture(scope="function")
+def database_scenario_complex(_seeded_database_scenario_complex, db_session):
+    """Complex database scenario with relationships and constraints"""
+    # Per-test writes land inside the db_session checkpoint; the seed rows persist
+    return _attach_scenario(db_session, _seeded_database_scenario_complex)
+
 # Mutation testing support fixtures
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def mutation_test_config():
     """Configuration for mutation testing"""
     return {
@@ -542,40 +696,44 @@ def pytest_configure(config):
     config.addinivalue_line("markers", "models: Database model tests")
     config.addinivalue_line("markers", "fixtures: Tests that use complex fixtures")
 
+# Directory names that imply a test level, checked in priority order
+_PATH_MARKERS = ("unit", "integration", "e2e")
+
+# Test name fragments and the marker each implies
+_NAME_MARKERS = {
+    "async": "asyncio",
+    "property": "property",
+    "auth": "auth",
+    "security": "security",
+    "performance": "performance",
+    "benchmark": "performance",
+    "slow": "slow",
+}
+_NAME_MARKER_PATTERN = re.compile("|".join(_NAME_MARKERS))
+
 def pytest_collection_modifyitems(config, items):
     """Modify test collection to add markers based on test location and name"""
+    # Items from the same file share a path classification, so compute it once per file
+    path_markers = {}
     for item in items:
         # Add markers based on test file location
-        if "unit" in str(item.fspath):
-            item.add_marker(pytest.mark.unit)
-        elif "integration" in str(item.fspath):
-            item.add_marker(pytest.mark.integration)
-        elif "e2e" in str(item.fspath):
-            item.add_marker(pytest.mark.e2e)
+        if item.path not in path_markers:
+            path_parts = set(item.path.parts)
+            path_markers[item.path] = next(
+                (marker for marker in _PATH_MARKERS if marker in path_parts), None
+            )
+        if path_markers[item.path] is not None:
+            item.add_marker(path_markers[item.path])
         
         # Add markers based on test name patterns
-        if "async" in item.name:
-            item.add_marker(pytest.mark.asyncio)
-        if "property" in item.name:
-            item.add_marker(pytest.mark.property)
-        if "auth" in item.name:
-            item.add_marker(pytest.mark.auth)
-        if "security" in item.name:
-            item.add_marker(pytest.mark.security)
-        if "performance" in item.name or "benchmark" in item.name:
-            item.add_marker(pytest.mark.performance)
-        if "slow" in item.name:
-            item.add_marker(pytest.mark.slow)
-
-@pytest.fixture(autouse=True)
+        for marker in {_NAME_MARKERS[match] for match in _NAME_MARKER_PATTERN.findall(item.name)}:
+            item.add_marker(marker)
+
+@pytest.fixture(scope="session", autouse=True)
 def setup_test_environment():
-    """Automatically set up test environment for each test"""
-    # Set test environment variables
-    os.environ["TESTING"] = "true"
-    os.environ["LOG_LEVEL"] = "WARNING"
-    
-    yield
-    
-    # Cleanup after test
-    if "TESTING" in os.environ:
-        del os.environ["TESTING"]
\ No newline at end of file
+    """Set up the test environment once for the whole session"""
+    # The values are constant, so set them once and restore the originals at session end
+    with pytest.MonkeyPatch.context() as session_monkeypatch:
+        session_monkeypatch.setenv("TESTING", "true")
+        session_monkeypatch.setenv("LOG_LEVEL", "WARNING")
+        yield
\ No newline at end of file
@@ -8,18 +8,60 @@ Purpose: E2E test execution and management for user workflow validation
 """
 
 import asyncio
+import contextlib
+import functools
 import json
+import os
+import re
 import subprocess
 import sys
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Collection, Dict, List, Optional, Any, Tuple
 import structlog
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 logger = structlog.get_logger()
 
+# Browser engine behind each mobile device project in playwright.config.ts
+DEVICE_BROWSERS = {
+    "Mobile Chrome": "chromium",
+    "Mobile Safari": "webkit",
+    "iPad": "webkit"
+}
+
+# Executable each browser leaves in the Playwright cache once installed
+BROWSER_EXECUTABLES = {
+    "chromium": "chrome-linux/chrome",
+    "firefox": "firefox/firefox",
+    "webkit": "pw_run.sh"
+}
+
+# Seconds to wait for a dev server started by the runner to accept connections
+SERVER_START_TIMEOUT_SECONDS = 120
+
+@dataclass(frozen=True)
+class _E2EServer:
+    """Dev server that playwright.config.ts would otherwise start per Playwright process"""
+    name: str
+    command: Tuple[str, ...]
+    cwd: str  # Relative to the repository root
+    port: int
+
+E2E_SERVERS = (
+    _E2EServer("backend", (sys.executable, "-m", "uvicorn", "main:app", "--host", "0.0.0.0", "--port", "8000"), ".", 8000),
+    _E2EServer("frontend", ("npm", "run", "dev"), "src", 3000)
+)
+
+# Auth state files written by the tests and shared by every suite
+AUTH_STATE_FILES = ("auth-state.json", "admin-auth-state.json")
+
 @dataclass
 class E2ETestResult:
     """E2E test result data structure"""
@@ -32,6 +74,46 @@ class E2ETestResult:
     video_path: Optional[str] = None
     trace_path: Optional[str] = None
 
+@dataclass
+class _SuiteAggregates:
+    """Suite and per-browser counts accumulated while parsing test results"""
+    passed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    browser_stats: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    
+    def add(self, result: E2ETestResult):
+        """Fold one test result into the counts"""
+        stats = self.browser_stats.get(result.browser)
+        if stats is None:
+            stats = self.browser_stats[result.browser] = {
+                'total': 0,
+                'passed': 0,
+                'failed': 0,
+                'skipped': 0,
+                'avg_duration_ms': 0,
+                'total_duration_ms': 0
+            }
+        
+        stats['total'] += 1
+        stats['total_duration_ms'] += result.duration_ms
+        
+        if result.status == 'passed':
+            self.passed += 1
+            stats['passed'] += 1
+        elif result.status == 'failed':
+            self.failed += 1
+            stats['failed'] += 1
+        elif result.status == 'skipped':
+            self.skipped += 1
+            stats['skipped'] += 1
+    
+    def browser_results(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-browser stats with average durations filled in"""
+        for stats in self.browser_stats.values():
+            stats['avg_duration_ms'] = stats['total_duration_ms'] // stats['total']
+        return self.browser_stats
+
 @dataclass
 class E2ETestSuite:
     """E2E test suite configuration"""
@@ -66,9 +148,12 @@ class E2ETestRunner:
     Manages Playwright test execution across multiple browsers and devices
     """
     
-    def __init__(self, config_path: Optional[str] = None):
+    def __init__(self, config_path: Optional[str] = None, max_concurrent_suites: Optional[int] = None):
         self.config_path = config_path or "tests/e2e/playwright.config.ts"
+        self.max_concurrent_suites = max_concurrent_suites or os.cpu_count() or 1
         self.test_dir = Path("tests/e2e")
+        self.repo_root = self.test_dir.parent.parent
+        self.servers_managed = False
         self.results_dir = self.test_dir / "test-results"
         self.reports_dir = self.test_dir / "reports"
         
@@ -152,19 +237,21 @@ class E2ETestRunner:
             # Install Playwright browsers if needed
             await self._ensure_browsers_installed()
             
-            # Run each test suite
-            for suite_name, suite_config in self.test_suites.items():
-                logger.info(f"Running E2E test suite: {suite_name}")
-                report = await self.run_test_suite(suite_config)
-                all_reports[suite_name] = report
-                
-                # Log suite results
-                logger.info(
-                    f"Suite {suite_name} completed",
-                    passed=report.passed_tests,
-                    failed=report.failed_tests,
-                    duration_ms=report.total_duration_ms
-                )
+            # Suites are independent, so run them concurrently up to the host's CPU count.
+            # They share one backend and frontend, as each Playwright process would
+            # otherwise try to start (and later stop) its own servers on the same ports
+            async with self._shared_servers():
+                semaphore = asyncio.Semaphore(self.max_concurrent_suites)
+                tasks = [
+                    asyncio.create_task(self._run_with_semaphore(semaphore, suite_name, suite_config))
+                    for suite_name, suite_config in self.test_suites.items()
+                ]
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+            
+            for suite_name, result in zip(self.test_suites, results):
+                if isinstance(result, BaseException):
+                    raise result
+                all_reports[suite_name] = result
             
             # Generate comprehensive report
             await self._generate_comprehensive_report(all_reports, overall_start_time)
@@ -175,20 +262,99 @@ class E2ETestRunner:
             logger.error("E2E test execution failed", error=str(e))
             raise
     
+    async def _run_with_semaphore(self, semaphore: asyncio.Semaphore, suite_name: str,
+                                  suite: E2ETestSuite) -> E2ETestReport:
+        """Run a test suite once a concurrency slot is free"""
+        async with semaphore:
+            logger.info(f"Running E2E test suite: {suite_name}")
+            report = await self.run_test_suite(suite)
+        
+        # Log suite results
+        logger.info(
+            f"Suite {suite_name} completed",
+            passed=report.passed_tests,
+            failed=report.failed_tests,
+            duration_ms=report.total_duration_ms
+        )
+        return report
+    
+    @contextlib.asynccontextmanager
+    async def _shared_servers(self):
+        """Start the backend and frontend once for every suite, reusing servers already running"""
+        started = []
+        self.servers_managed = True
+        try:
+            for server in E2E_SERVERS:
+                if await self._port_open(server.port):
+                    logger.info("Reusing running E2E server", server=server.name, port=server.port)
+                    continue
+                
+                logger.info("Starting E2E server", server=server.name, port=server.port)
+                with open(self.results_dir / f"{server.name}-server.log", 'wb') as log:
+                    process = await asyncio.create_subprocess_exec(
+                        *server.command,
+                        cwd=self.repo_root / server.cwd,
+                        stdout=log,
+                        stderr=asyncio.subprocess.STDOUT
+                    )
+                started.append(process)
+                await self._wait_for_server(server, process)
+            
+            yield
+            
+        finally:
+            self.servers_managed = False
+            for process in reversed(started):
+                if process.returncode is None:
+                    process.terminate()
+                    await process.wait()
+            
+            # Playwright's global teardown leaves shared auth state alone while suites overlap
+            for name in AUTH_STATE_FILES:
+                (self.test_dir / name).unlink(missing_ok=True)
+    
+    async def _wait_for_server(self, server: _E2EServer, process: asyncio.subprocess.Process):
+        """Wait until a started server accepts connections"""
+        deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+        while not await self._port_open(server.port):
+            if process.returncode is not None:
+                raise RuntimeError(f"E2E {server.name} server exited with code {process.returncode}")
+            if time.monotonic() > deadline:
+                raise RuntimeError(
+                    f"E2E {server.name} server not listening on port {server.port} "
+                    f"after {SERVER_START_TIMEOUT_SECONDS}s"
+                )
+            await asyncio.sleep(0.5)
+    
+    @staticmethod
+    async def _port_open(port: int) -> bool:
+        """Check whether something is accepting connections on a local port"""
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+        except OSError:
+            return False
+        writer.close()
+        await writer.wait_closed()
+        return True
+    
     async def run_test_suite(self, suite: E2ETestSuite) -> E2ETestReport:
         """Run a specific test suite"""
         start_time = datetime.now()
         
         try:
+            # Each suite writes to its own directory so concurrent runs do not collide
+            output_dir = self._suite_results_dir(suite)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            
             # Build Playwright command
-            cmd = self._build_playwright_command(suite)
+            cmd = self._build_playwright_command(suite, output_dir)
             
             # Execute tests
             logger.info(f"Executing Playwright tests for suite: {suite.name}")
-            result = await self._execute_playwright_command(cmd)
+            result = await self._execute_playwright_command(cmd, output_dir)
             
-            # Parse results
-            test_results = await self._parse_test_results()
+            # Parse results, counting statuses and browser stats in the same pass
+            test_results, aggregates = await self._parse_test_results(output_dir)
             
             # Calculate metrics
             end_time = datetime.now()
@@ -200,11 +366,11 @@ class E2ETestRunner:
                 start_time=start_time,
                 end_time=end_time,
                 total_tests=len(test_results),
-                passed_tests=len([r for r in test_results if r.status == 'passed']),
-                failed_tests=len([r for r in test_results if r.status == 'failed']),
-                skipped_tests=len([r for r in test_results if r.status == 'skipped']),
+                passed_tests=aggregates.passed,
+                failed_tests=aggregates.failed,
+                skipped_tests=aggregates.skipped,
                 total_duration_ms=duration_ms,
-                browser_results=await self._analyze_browser_results(test_results),
+                browser_results=aggregates.browser_results(),
                 test_results=test_results
             )
             
@@ -256,13 +422,29 @@ class E2ETestRunner:
         
         return await self.run_test_suite(critical_suite)
     
-    def _build_playwright_command(self, suite: E2ETestSuite) -> List[str]:
+    @functools.cached_property
+    def _playwright_cli(self) -> List[str]:
+        """Resolve the Playwright CLI once, preferring the locally installed binary"""
+        # Calling the binary directly skips npx's package resolution on every spawn
+        local_cli = self.test_dir / "node_modules" / ".bin" / "playwright"
+        if local_cli.exists():
+            return [str(local_cli.resolve())]
+        return ["npx", "playwright"]
+    
+    def _suite_results_dir(self, suite: E2ETestSuite) -> Path:
+        """Get the results directory for a test suite"""
+        slug = re.sub(r"[^a-z0-9]+", "-", suite.name.lower()).strip("-")
+        return self.results_dir / slug
+    
+    def _build_playwright_command(self, suite: E2ETestSuite, output_dir: Path) -> List[str]:
         """Build Playwright command with appropriate options"""
         cmd = [
-            "npx", "playwright", "test",
+            *self._playwright_cli, "test",
             "--config", self.config_path,
             "--reporter=json",
-            f"--output-dir={self.results_dir}",
+            # Playwright empties its output directory on startup, so artifacts get their own
+            # subdirectory and the suite's logs and results.json survive the run
+            f"--output-dir={(output_dir / 'artifacts').resolve()}",
             f"--workers={suite.parallel_workers}",
             f"--timeout={suite.timeout_ms}",
             f"--retries={suite.retries}"
@@ -281,69 +463,85 @@ class E2ETestRunner:
         
         return cmd
     
-    async def _execute_playwright_command(self, cmd: List[str]) -> subprocess.CompletedProcess:
+    async def _execute_playwright_command(self, cmd: List[str], output_dir: Path) -> subprocess.CompletedProcess:
         """Execute Playwright command asynchronously"""
         try:
-            # Change to E2E test directory
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                cwd=self.test_dir,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
+            # Point the JSON reporter at the suite's own results file
+            env = {**os.environ, "PLAYWRIGHT_JSON_OUTPUT_NAME": str((output_dir / "results.json").resolve())}
+            if self.servers_managed:
+                # Tell playwright.config.ts to reuse the runner's servers, even on CI
+                env["E2E_SERVERS_MANAGED"] = "1"
+            
+            # Console output goes straight to log files instead of being buffered in memory
+            stdout_path = output_dir / "stdout.log"
+            stderr_path = output_dir / "stderr.log"
             
-            stdout, stderr = await process.communicate()
+            with open(stdout_path, 'wb') as stdout, open(stderr_path, 'wb') as stderr:
+                # Change to E2E test directory
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    cwd=self.test_dir,
+                    env=env,
+                    stdout=stdout,
+                    stderr=stderr
+                )
+                
+                await process.wait()
             
             if process.returncode != 0:
                 logger.warning(
                     "Playwright tests completed with failures",
                     return_code=process.returncode,
-                    stderr=stderr.decode()
+                    stderr_path=str(stderr_path)
                 )
             
-            return subprocess.CompletedProcess(
-                cmd, process.returncode, stdout, stderr
-            )
+            return subprocess.CompletedProcess(cmd, process.returncode)
             
         except Exception as e:
             logger.error("Failed to execute Playwright command", error=str(e))
             raise
     
-    async def _parse_test_results(self) -> List[E2ETestResult]:
+    async def _parse_test_results(self, output_dir: Path) -> Tuple[List[E2ETestResult], _SuiteAggregates]:
         """Parse Playwright test results from JSON output"""
-        results_file = self.results_dir / "results.json"
+        results_file = output_dir / "results.json"
         
         if not results_file.exists():
             logger.warning("No test results file found")
-            return []
+            return [], _SuiteAggregates()
         
         try:
-            with open(results_file, 'r') as f:
-                data = json.load(f)
-            
             test_results = []
+            aggregates = _SuiteAggregates()
             
-            for suite in data.get('suites', []):
-                for spec in suite.get('specs', []):
-                    for test in spec.get('tests', []):
-                        for result in test.get('results', []):
-                            test_result = E2ETestResult(
-                                test_name=test.get('title', 'Unknown'),
-                                status=result.get('status', 'unknown'),
-                                duration_ms=result.get('duration', 0),
-                                browser=result.get('workerIndex', 'unknown'),
-                                error_message=result.get('error', {}).get('message') if result.get('error') else None,
-                                screenshot_path=self._find_artifact(result, 'screenshot'),
-                                video_path=self._find_artifact(result, 'video'),
-                                trace_path=self._find_artifact(result, 'trace')
-                            )
-                            test_results.append(test_result)
+            with open(results_file, 'rb') as f:
+                # Stream one top-level suite at a time instead of loading the whole report
+                if ijson is not None:
+                    suites = ijson.items(f, 'suites.item', use_float=True)
+                else:
+                    suites = json.load(f).get('suites', [])
+                
+                for suite in suites:
+                    for spec in suite.get('specs', []):
+                        for test in spec.get('tests', []):
+                            for result in test.get('results', []):
+                                test_result = E2ETestResult(
+                                    test_name=test.get('title', 'Unknown'),
+                                    status=result.get('status', 'unknown'),
+                                    duration_ms=result.get('duration', 0),
+                                    browser=result.get('workerIndex', 'unknown'),
+                                    error_message=result.get('error', {}).get('message') if result.get('error') else None,
+                                    screenshot_path=self._find_artifact(result, 'screenshot'),
+                                    video_path=self._find_artifact(result, 'video'),
+                                    trace_path=self._find_artifact(result, 'trace')
+                                )
+                                test_results.append(test_result)
+                                aggregates.add(test_result)
             
-            return test_results
+            return test_results, aggregates
             
         except Exception as e:
             logger.error("Failed to parse test results", error=str(e))
-            return []
+            return [], _SuiteAggregates()
     
     def _find_artifact(self, result: Dict, artifact_type: str) -> Optional[str]:
         """Find artifact path in test result"""
@@ -353,43 +551,50 @@ class E2ETestRunner:
                 return attachment.get('path')
         return None
     
-    async def _analyze_browser_results(self, test_results: List[E2ETestResult]) -> Dict[str, Dict[str, Any]]:
-        """Analyze test results by browser"""
-        browser_results = {}
-        
-        for result in test_results:
-            browser = result.browser
-            if browser not in browser_results:
-                browser_results[browser] = {
-                    'total': 0,
-                    'passed': 0,
-                    'failed': 0,
-                    'skipped': 0,
-                    'avg_duration_ms': 0,
-                    'total_duration_ms': 0
-                }
-            
-            browser_results[browser]['total'] += 1
-            browser_results[browser]['total_duration_ms'] += result.duration_ms
-            
-            if result.status == 'passed':
-                browser_results[browser]['passed'] += 1
-            elif result.status == 'failed':
-                browser_results[browser]['failed'] += 1
-            elif result.status == 'skipped':
-                browser_results[browser]['skipped'] += 1
+    def _required_browsers(self) -> List[str]:
+        """Get the browser engines referenced by the configured test suites"""
+        browsers = set()
+        for suite in self.test_suites.values():
+            browsers.update(suite.browsers)
+            browsers.update(DEVICE_BROWSERS[device] for device in suite.mobile_devices)
+        return sorted(browsers)
+    
+    def _browser_revisions(self) -> Dict[str, str]:
+        """Read the browser revisions pinned by the installed Playwright version"""
+        browsers_file = self.test_dir / "node_modules" / "playwright-core" / "browsers.json"
+        if not browsers_file.exists():
+            return {}
         
-        # Calculate averages
-        for browser, stats in browser_results.items():
-            if stats['total'] > 0:
-                stats['avg_duration_ms'] = stats['total_duration_ms'] // stats['total']
+        with open(browsers_file, 'r') as f:
+            data = json.load(f)
+        return {browser['name']: browser['revision'] for browser in data.get('browsers', [])}
+    
+    def _missing_browsers(self, browsers: List[str]) -> List[str]:
+        """Get the browsers that are not yet in the Playwright browser cache"""
+        cache_dir = Path(os.environ.get("PLAYWRIGHT_BROWSERS_PATH") or Path.home() / ".cache" / "ms-playwright")
+        revisions = self._browser_revisions()
         
-        return browser_results
+        missing = []
+        for browser in browsers:
+            # Match the pinned revision when known, otherwise any cached revision
+            pattern = f"{browser}-{revisions.get(browser, '*')}/{BROWSER_EXECUTABLES[browser]}"
+            if not any(cache_dir.glob(pattern)):
+                missing.append(browser)
+        return missing
     
     async def _ensure_browsers_installed(self):
         """Ensure Playwright browsers are installed"""
+        if os.environ.get("HEADSTART_SKIP_BROWSER_INSTALL"):
+            logger.info("Skipping Playwright browser installation")
+            return
+        
         try:
-            cmd = ["npx", "playwright", "install", "--with-deps"]
+            missing = self._missing_browsers(self._required_browsers())
+            if not missing:
+                logger.info("Playwright browsers already installed")
+                return
+            
+            cmd = [*self._playwright_cli, "install", "--with-deps", *missing]
             process = await asyncio.create_subprocess_exec(
                 *cmd,
                 cwd=self.test_dir,
@@ -448,8 +653,8 @@ class E2ETestRunner:
                 "success_rate": (total_passed / max(total_tests, 1)) * 100
             },
             "suite_reports": {name: asdict(report) for name, report in all_reports.items()},
-            "browser_compatibility": self._analyze_browser_compatibility(all_reports),
-            "mobile_compatibility": self._analyze_mobile_compatibility(all_reports)
+            "browser_compatibility": self._aggregate_compatibility(all_reports),
+            "mobile_compatibility": self._aggregate_compatibility(all_reports, DEVICE_BROWSERS)
         }
         
         # Save JSON report
@@ -466,57 +671,35 @@ class E2ETestRunner:
             report_path=str(json_report_path)
         )
     
-    def _analyze_browser_compatibility(self, all_reports: Dict[str, E2ETestReport]) -> Dict[str, Any]:
-        """Analyze browser compatibility across all test suites"""
-        browser_compatibility = {}
+    def _aggregate_compatibility(self, all_reports: Dict[str, E2ETestReport],
+                                 browsers: Optional[Collection[str]] = None) -> Dict[str, Any]:
+        """Aggregate per-browser results across all test suites, optionally for selected browsers only"""
+        compatibility = {}
         
-        for suite_name, report in all_reports.items():
+        for report in all_reports.values():
             for browser, stats in report.browser_results.items():
-                if browser not in browser_compatibility:
-                    browser_compatibility[browser] = {
+                if browsers is not None and browser not in browsers:
+                    continue
+                
+                totals = compatibility.get(browser)
+                if totals is None:
+                    totals = compatibility[browser] = {
                         'total_tests': 0,
                         'passed_tests': 0,
                         'failed_tests': 0,
                         'success_rate': 0.0
                     }
                 
-                browser_compatibility[browser]['total_tests'] += stats['total']
-                browser_compatibility[browser]['passed_tests'] += stats['passed']
-                browser_compatibility[browser]['failed_tests'] += stats['failed']
-        
-        # Calculate success rates
-        for browser, stats in browser_compatibility.items():
-            if stats['total_tests'] > 0:
-                stats['success_rate'] = (stats['passed_tests'] / stats['total_tests']) * 100
-        
-        return browser_compatibility
-    
-    def _analyze_mobile_compatibility(self, all_reports: Dict[str, E2ETestReport]) -> Dict[str, Any]:
-        """Analyze mobile device compatibility"""
-        mobile_devices = ["Mobile Chrome", "Mobile Safari", "iPad"]
-        mobile_compatibility = {}
-        
-        for suite_name, report in all_reports.items():
-            for browser, stats in report.browser_results.items():
-                if browser in mobile_devices:
-                    if browser not in mobile_compatibility:
-                        mobile_compatibility[browser] = {
-                            'total_tests': 0,
-                            'passed_tests': 0,
-                            'failed_tests': 0,
-                            'success_rate': 0.0
-                        }
-                    
-                    mobile_compatibility[browser]['total_tests'] += stats['total']
-                    mobile_compatibility[browser]['passed_tests'] += stats['passed']
-                    mobile_compatibility[browser]['failed_tests'] += stats['failed']
+                totals['total_tests'] += stats['total']
+                totals['passed_tests'] += stats['passed']
+                totals['failed_tests'] += stats['failed']
         
         # Calculate success rates
-        for device, stats in mobile_compatibility.items():
+        for stats in compatibility.values():
             if stats['total_tests'] > 0:
                 stats['success_rate'] = (stats['passed_tests'] / stats['total_tests']) * 100
         
-        return mobile_compatibility
+        return compatibility
 
 # CLI interface for running E2E tests
 async def main():
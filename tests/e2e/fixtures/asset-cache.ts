@@ -0,0 +1,85 @@
+import { test as base, expect, Route } from '@playwright/test';
+import { createHash, randomUUID } from 'crypto';
+import * as fs from 'fs/promises';
+import * as path from 'path';
+
+/**
+ * Static Asset Cache Fixture
+ * Serves CSS, JS, fonts and images from an on-disk cache shared across test runs
+ */
+
+const CACHE_DIR = path.join(__dirname, '..', '.cache_static');
+const ASSET_PATTERN = /\.(css|js|woff2|png|webp|gif|svg)(\?.*)?$/;
+
+// Workers and concurrent suites share the cache, so entries are written to a temp file
+// and renamed into place; readers never see a partially written file
+async function writeAtomic(file: string, data: string | Buffer): Promise<void> {
+  const tempFile = `${file}.${process.pid}-${randomUUID()}.tmp`;
+  try {
+    await fs.writeFile(tempFile, data);
+    await fs.rename(tempFile, file);
+  } catch (error) {
+    await fs.rm(tempFile, { force: true });
+    throw error;
+  }
+}
+
+// How long a response may be served from the cache, following its Cache-Control
+// header: forever when immutable, for max-age otherwise, and not at all when the
+// server asks for revalidation (as `next dev` does for its unhashed chunks)
+function cacheLifetimeMs(cacheControl: string): number | null {
+  if (/\b(no-store|no-cache)\b/i.test(cacheControl)) {
+    return null;
+  }
+  if (/\bimmutable\b/i.test(cacheControl)) {
+    return Infinity;
+  }
+  const maxAge = Number(/\bmax-age=(\d+)/i.exec(cacheControl)?.[1] ?? 0);
+  return maxAge > 0 ? maxAge * 1000 : null;
+}
+
+async function serveCachedAsset(route: Route): Promise<void> {
+  const url = route.request().url();
+  const cacheFile = path.join(CACHE_DIR, createHash('md5').update(url).digest('hex'));
+
+  try {
+    const { status, headers, expiresAt } = JSON.parse(await fs.readFile(`${cacheFile}.json`, 'utf8'));
+    // A null expiry marks an immutable entry
+    if (expiresAt === null || Date.now() < expiresAt) {
+      const body = await fs.readFile(cacheFile);
+      await route.fulfill({ status, headers, body });
+      return;
+    }
+  } catch {
+    // Cache miss, fall through to the network
+  }
+
+  const response = await route.fetch();
+  const headers = response.headers();
+  const body = await response.body();
+
+  // Only keep successful responses the server marks as reusable without revalidation
+  const lifetimeMs = cacheLifetimeMs(headers['cache-control'] ?? '');
+  if (response.ok() && lifetimeMs !== null) {
+    const expiresAt = lifetimeMs === Infinity ? null : Date.now() + lifetimeMs;
+
+    // The sidecar goes last, so an entry is only visible once its body is complete
+    await fs.mkdir(CACHE_DIR, { recursive: true });
+    await writeAtomic(cacheFile, body);
+    await writeAtomic(`${cacheFile}.json`, JSON.stringify({ status: response.status(), headers, expiresAt }));
+  }
+
+  await route.fulfill({ response, body });
+}
+
+export const test = base.extend({
+  context: async ({ context }, use) => {
+    // Set E2E_DISABLE_ASSET_CACHE when asset load timings must hit the server
+    if (!process.env.E2E_DISABLE_ASSET_CACHE) {
+      await context.route(ASSET_PATTERN, serveCachedAsset);
+    }
+    await use(context);
+  },
+});
+
+export { expect };
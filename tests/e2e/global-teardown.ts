@@ -9,6 +9,11 @@ import path from 'path';
 async function globalTeardown(config: FullConfig) {
   console.log('🧹 Starting E2E test environment cleanup...');
   
+  // Suites run concurrently by the Python runner share auth state; it cleans up after the last one
+  if (process.env.E2E_SERVERS_MANAGED) {
+    return;
+  }
+  
   try {
     // Clean up auth state files
     const authStatePath = path.join(__dirname, 'auth-state.json');
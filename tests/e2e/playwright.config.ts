@@ -108,18 +108,19 @@ export default defineConfig({
   globalSetup: require.resolve('./global-setup.ts'),
   globalTeardown: require.resolve('./global-teardown.ts'),
 
-  // Run your local dev server before starting the tests
+  // Run your local dev server before starting the tests; the Python runner sets
+  // E2E_SERVERS_MANAGED when it has started both servers for concurrent suites
   webServer: [
     {
       command: 'cd .. && python -m uvicorn main:app --host 0.0.0.0 --port 8000',
       port: 8000,
-      reuseExistingServer: !process.env.CI,
+      reuseExistingServer: !process.env.CI || !!process.env.E2E_SERVERS_MANAGED,
       timeout: 120000,
     },
     {
       command: 'cd ../src && npm run dev',
       port: 3000,
-      reuseExistingServer: !process.env.CI,
+      reuseExistingServer: !process.env.CI || !!process.env.E2E_SERVERS_MANAGED,
       timeout: 120000,
     }
   ],
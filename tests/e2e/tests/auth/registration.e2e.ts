@@ -1,4 +1,4 @@
-import { test, expect } from '@playwright/test';
+import { test, expect } from '../../fixtures/asset-cache';
 import { RegistrationPage } from '../../page-objects/registration-page';
 import { LoginPage } from '../../page-objects/login-page';
 
@@ -1,4 +1,4 @@
-import { test, expect } from '@playwright/test';
+import { test, expect } from '../../fixtures/asset-cache';
 import { LoginPage } from '../../page-objects/login-page';
 import { DashboardPage } from '../../page-objects/dashboard-page';
 
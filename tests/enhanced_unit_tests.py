@@ -9,7 +9,9 @@ Purpose: Enhanced unit testing framework validation
 
 import pytest
 import asyncio
-from unittest.mock import Mock, patch
+import httpx
+import respx
+from unittest.mock import patch
 from hypothesis import given, strategies as st, assume
 from services.content_processing import ContentProcessor
 from services.security import SecurityValidator
@@ -112,22 +114,18 @@ class TestEnhancedContentTesting:
         """Test async content processing with mocks"""
         processor = ContentProcessor()
         
-        with patch('httpx.AsyncClient') as mock_client:
-            mock_response = Mock()
-            mock_response.json.return_value = mock_external_apis['youtube_api'].json.return_value
-            mock_response.raise_for_status.return_value = None
+        with respx.mock:
+            videos_route = respx.get("https://www.googleapis.com/youtube/v3/videos").mock(
+                return_value=httpx.Response(200, json=mock_external_apis['youtube_api'].json.return_value)
+            )
             
-            mock_client_instance = Mock()
-            mock_client_instance.get.return_value = mock_response
-            mock_client.return_value.__aenter__.return_value = mock_client_instance
+            with patch.object(processor, 'generate_embedding', return_value=[0.1] * 1536):
+                result = await processor.process_youtube_content("https://youtube.com/watch?v=dQw4w9WgXcQ")
             
-            with patch('services.content_processing.openai.Embedding.acreate') as mock_openai:
-                mock_openai.return_value = {'data': [{'embedding': [0.1] * 1536}]}
-                
-                result = await processor.process_youtube_content("https://youtube.com/watch?v=test")
-                
-                assert result['title'] == 'Test Video'
-                assert 'embedding' in result
+            assert videos_route.called
+            assert videos_route.calls.last.request.url.params["id"] == "dQw4w9WgXcQ"
+            assert result['title'] == 'Test Video'
+            assert 'embedding' in result
 
 @pytest.mark.unit
 @pytest.mark.security
@@ -234,4 +234,29 @@ class TestContentProcessorIntegration:
         assert 'AI' in result['topics']
         assert 'embedding' in result
 
+class TestBatchEmbeddings:
+    """Test batched embedding generation"""
+    
+    @pytest.mark.asyncio
+    async def test_generate_embeddings_deduplicates_texts(self, content_processor):
+        """Test repeated texts are embedded once and returned in input order"""
+        ai_client = Mock()
+        ai_client.generate_multiple_embeddings = AsyncMock(return_value=[[1.0], [2.0]])
+        
+        with patch('services.content_processing.get_ai_client', return_value=ai_client):
+            embeddings = await content_processor.generate_embeddings(["a", "b", "a"])
+        
+        assert embeddings == [[1.0], [2.0], [1.0]]
+        ai_client.generate_multiple_embeddings.assert_awaited_once_with(["a", "b"])
+    
+    @pytest.mark.asyncio
+    async def test_generate_embeddings_count_mismatch(self, content_processor):
+        """Test a short embedding response is rejected rather than misaligned"""
+        ai_client = Mock()
+        ai_client.generate_multiple_embeddings = AsyncMock(return_value=[[1.0]])
+        
+        with patch('services.content_processing.get_ai_client', return_value=ai_client):
+            with pytest.raises(ContentProcessingError):
+                await content_processor.generate_embeddings(["a", "b"])
+
 # Updated 2025-09-05: Comprehensive content processing tests
\ No newline at end of file
@@ -0,0 +1,328 @@
+"""
+Content Task Tests
+Test content processing Celery tasks
+
+Author: HeadStart Development Team
+Created: 2025-09-05
+Purpose: Test background content processing tasks without a broker or external database
+"""
+
+import asyncio
+import os
+import tempfile
+import httpx
+import pytest
+import redis
+import respx
+from datetime import datetime, timedelta
+from unittest.mock import ANY, Mock, patch, AsyncMock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from config.settings import get_settings
+from services.models import ContentItem
+from services.tasks import content_tasks
+
+# arXiv Atom response for a single paper
+ARXIV_FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+    <entry>
+        <title>Paper {arxiv_id}</title>
+        <summary>Abstract {arxiv_id}</summary>
+        <author><name>Author {arxiv_id}</name></author>
+        <category term="cs.AI"/>
+    </entry>
+</feed>"""
+
+@pytest.fixture
+def mock_db():
+    """Mock database session returned by the task session factory"""
+    db = Mock()
+    with patch.object(content_tasks, 'get_db_session', return_value=db):
+        yield db
+
+@pytest.fixture(autouse=True)
+def mock_redis():
+    """Mock Redis client used for task bookkeeping"""
+    client = Mock()
+    client.exists.return_value = 0
+    client.incr.return_value = 1
+    with patch.object(content_tasks, 'get_redis_client', return_value=client):
+        yield client
+
+@pytest.fixture
+def sqlite_engine():
+    """In-memory SQLite engine with the content items table"""
+    engine = create_engine("sqlite://")
+    ContentItem.__table__.create(engine)
+    return engine
+
+class TestContentTasks:
+    """Test content processing tasks"""
+    
+    def test_db_session_reused_within_worker_thread(self):
+        """Test tasks on the same worker thread share one scoped session"""
+        from services.database import ScopedSession
+        
+        try:
+            assert content_tasks.get_db_session() is content_tasks.get_db_session()
+        finally:
+            ScopedSession.remove()
+    
+    def test_process_content_embedding_runs_async_embedding(self, sqlite_engine):
+        """Test the embedding coroutine is awaited from the synchronous task"""
+        db = sessionmaker(bind=sqlite_engine)()
+        db.add_all([
+            ContentItem(id="new", title="Intro to Python", description="Basics", content_type="course", source="web"),
+            ContentItem(id="done", title="Done", content_type="course", source="web", embedding=[0.5])
+        ])
+        db.commit()
+        
+        with patch.object(content_tasks, 'get_db_session', return_value=db), \
+                patch.object(content_tasks.content_processor, 'generate_embedding',
+                             AsyncMock(return_value=[0.5, -0.25])) as mock_embed:
+            result = content_tasks.process_content_embedding("new")
+            skipped = content_tasks.process_content_embedding("done")
+            missing = content_tasks.process_content_embedding("unknown")
+        
+        assert result["status"] == "success"
+        assert skipped["status"] == "skipped"
+        assert missing["status"] == "error"
+        mock_embed.assert_awaited_once_with("Intro to Python Basics")
+        
+        stored = sessionmaker(bind=sqlite_engine)().get(ContentItem, "new")
+        assert stored.embedding == [0.5, -0.25]
+    
+    def test_batch_update_content_metadata(self, mock_db):
+        """Test refreshed metadata is written back with one bulk update"""
+        content = Mock(id="content-1", source_id="2101.00001")
+        claimed = mock_db.query.return_value.filter.return_value.order_by.return_value.limit.return_value
+        claimed.with_for_update.return_value.all.return_value = [content]
+        updated_data = {"metadata": {"authors": ["A"]}, "topics": ["AI"]}
+        
+        with patch.object(content_tasks.content_processor, 'fetch_arxiv_metadata',
+                          AsyncMock(return_value=updated_data)):
+            result = content_tasks.batch_update_content_metadata("arxiv")
+        
+        assert result == {"status": "success", "updated_count": 1}
+        claimed.with_for_update.assert_called_once_with(skip_locked=True)
+        mock_db.bulk_update_mappings.assert_called_once_with(content_tasks.ContentItem, [
+            {"id": "content-1", "content_metadata": {"authors": ["A"]}, "topics": ["AI"],
+             "last_metadata_refresh_at": ANY}
+        ])
+        mock_db.commit.assert_called_once()
+    
+    def test_batch_process_content_embeddings(self, sqlite_engine):
+        """Test embeddings are generated per chunk and written in one bulk update"""
+        db = sessionmaker(bind=sqlite_engine)()
+        db.add(ContentItem(id="content-0", title="Title 0", content_type="course", source="web", embedding=[0.5]))
+        db.add_all([
+            ContentItem(id=f"content-{i}", title=f"Title {i}", content_type="course", source="web")
+            for i in range(1, 4)
+        ])
+        db.commit()
+        
+        async def fake_embeddings(texts):
+            return [[float(len(text))] for text in texts]
+        
+        with patch.object(content_tasks, 'get_db_session', return_value=db), \
+                patch.object(content_tasks.content_processor, 'generate_embeddings',
+                             AsyncMock(side_effect=fake_embeddings)) as mock_embed:
+            result = content_tasks.batch_process_content_embeddings(
+                ["content-0", "content-1", "content-2", "content-3"], batch_size=2
+            )
+        
+        assert result == {"status": "success", "updated_count": 3}
+        assert sorted(text for call in mock_embed.await_args_list for text in call.args[0]) == [
+            "Title 1 ", "Title 2 ", "Title 3 "
+        ]
+        assert [len(call.args[0]) for call in mock_embed.await_args_list] == [2, 1]
+        
+        stored = sessionmaker(bind=sqlite_engine)().query(ContentItem.id, ContentItem.embedding).order_by(ContentItem.id).all()
+        assert [tuple(row) for row in stored] == [
+            ("content-0", [0.5]), ("content-1", [8.0]), ("content-2", [8.0]), ("content-3", [8.0])
+        ]
+    
+    def test_batch_update_content_metadata_concurrent(self, mock_db):
+        """Test metadata fetches overlap and a failing item does not stop the rest"""
+        content_items = [Mock(id=f"content-{i}", source_id=f"id-{i}", url=f"https://youtu.be/{i}") for i in range(3)]
+        claimed = mock_db.query.return_value.filter.return_value.order_by.return_value.limit.return_value
+        claimed.with_for_update.return_value.all.return_value = content_items
+        in_flight = 0
+        max_in_flight = 0
+        
+        async def fake_fetch(url):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if url.endswith("1"):
+                raise RuntimeError("API error")
+            return {"metadata": {"url": url}, "topics": []}
+        
+        with patch.object(content_tasks.content_processor, 'fetch_youtube_metadata',
+                          AsyncMock(side_effect=fake_fetch)):
+            result = content_tasks.batch_update_content_metadata("youtube")
+        
+        assert result == {"status": "success", "updated_count": 2}
+        assert max_in_flight == 3
+        rows = mock_db.bulk_update_mappings.call_args.args[1]
+        assert [row["id"] for row in rows] == ["content-0", "content-2"]
+    
+    def test_batch_update_content_metadata_skips_recent_refreshes(self, sqlite_engine):
+        """Test only items not refreshed within the interval are fetched"""
+        db = sessionmaker(bind=sqlite_engine)()
+        db.add_all([
+            ContentItem(id="never", title="Never", content_type="paper", source="arxiv",
+                        source_id="1", status="approved"),
+            ContentItem(id="stale", title="Stale", content_type="paper", source="arxiv", source_id="2",
+                        status="approved", last_metadata_refresh_at=datetime.utcnow() - timedelta(days=30)),
+            ContentItem(id="fresh", title="Fresh", content_type="paper", source="arxiv", source_id="3",
+                        status="approved", last_metadata_refresh_at=datetime.utcnow()),
+            ContentItem(id="no-source-id", title="Manual", content_type="paper", source="arxiv",
+                        status="approved")
+        ])
+        db.commit()
+        
+        requested_ids = []
+        
+        def arxiv_feed(request):
+            arxiv_id = request.url.params["id_list"]
+            requested_ids.append(arxiv_id)
+            return httpx.Response(200, content=ARXIV_FEED.format(arxiv_id=arxiv_id).encode())
+        
+        with patch.object(content_tasks, 'get_db_session', return_value=db), respx.mock:
+            respx.get(get_settings().ARXIV_API_BASE_URL).mock(side_effect=arxiv_feed)
+            result = content_tasks.batch_update_content_metadata("arxiv")
+        
+        assert result == {"status": "success", "updated_count": 2}
+        assert sorted(requested_ids) == ["1", "2"]
+        
+        stored = sessionmaker(bind=sqlite_engine)().query(ContentItem).order_by(ContentItem.id).all()
+        refreshed = {item.id: item for item in stored if item.content_metadata}
+        assert sorted(refreshed) == ["never", "stale"]
+        for item in refreshed.values():
+            assert item.content_metadata["authors"] == [f"Author {item.source_id}"]
+            assert item.topics == ["AI", "Research", "Academic"]
+            assert item.last_metadata_refresh_at > datetime.utcnow() - timedelta(minutes=1)
+    
+    def test_cleanup_failed_uploads(self, sqlite_engine):
+        """Test stale pending uploads are deleted with their files in one pass"""
+        db = sessionmaker(bind=sqlite_engine)()
+        stale = datetime.utcnow() - timedelta(days=2)
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            upload_path = os.path.join(temp_dir, "upload.pdf")
+            open(upload_path, "w").close()
+            
+            db.add_all([
+                ContentItem(id="stale", title="Stale", content_type="paper", source="upload",
+                            url=upload_path, status="pending", created_at=stale),
+                ContentItem(id="missing-file", title="Missing", content_type="paper", source="upload",
+                            url=os.path.join(temp_dir, "gone.pdf"), status="pending", created_at=stale),
+                ContentItem(id="recent", title="Recent", content_type="paper", source="upload",
+                            status="pending", created_at=datetime.utcnow()),
+                ContentItem(id="approved", title="Approved", content_type="paper", source="upload",
+                            status="approved", created_at=stale)
+            ])
+            db.commit()
+            
+            with patch.object(content_tasks, 'get_db_session', return_value=db):
+                result = content_tasks.cleanup_failed_uploads()
+            
+            assert result == {"status": "success", "cleaned_count": 2}
+            assert not os.path.exists(upload_path)
+        
+        remaining = sessionmaker(bind=sqlite_engine)().query(ContentItem.id).order_by(ContentItem.id).all()
+        assert [row.id for row in remaining] == ["approved", "recent"]
+    
+    def test_generate_content_difficulty_levels(self, sqlite_engine):
+        """Test only unlabelled approved content is assigned a difficulty level"""
+        db = sessionmaker(bind=sqlite_engine)()
+        db.add_all([
+            ContentItem(id="intro", title="Python Basics", content_type="course", source="web",
+                        status="approved", embedding=[0.1] * 1536),
+            ContentItem(id="labelled", title="Python Basics", content_type="course", source="web",
+                        status="approved", difficulty_level="advanced"),
+            ContentItem(id="pending", title="Deep Dive", content_type="course", source="web")
+        ])
+        db.commit()
+        db.expunge_all()
+        
+        with patch.object(content_tasks, 'get_db_session', return_value=db):
+            result = content_tasks.generate_content_difficulty_levels()
+        
+        assert result == {"status": "success", "updated_count": 1}
+        
+        levels = sessionmaker(bind=sqlite_engine)().query(
+            ContentItem.id, ContentItem.difficulty_level
+        ).order_by(ContentItem.id).all()
+        assert [tuple(row) for row in levels] == [
+            ("intro", "beginner"), ("labelled", "advanced"), ("pending", None)
+        ]
+    
+    def test_cleanup_failed_uploads_idle_backoff(self, mock_db, mock_redis):
+        """Test empty runs widen the skip window and runs inside it skip the database"""
+        mock_db.execute.return_value.all.return_value = []
+        mock_redis.incr.return_value = 3
+        
+        result = content_tasks.cleanup_failed_uploads()
+        
+        assert result == {"status": "success", "cleaned_count": 0}
+        key = f"poll_backoff:{content_tasks.cleanup_failed_uploads.name}"
+        mock_redis.incr.assert_called_once_with(f"{key}:idle")
+        mock_redis.set.assert_called_once_with(f"{key}:skip", 1, ex=content_tasks.POLL_BACKOFF_BASE_SECONDS * 4)
+        
+        mock_db.reset_mock()
+        mock_redis.exists.return_value = 1
+        
+        assert content_tasks.cleanup_failed_uploads()["status"] == "skipped"
+        mock_db.execute.assert_not_called()
+    
+    def test_poll_backoff_resets_after_work(self, mock_redis):
+        """Test finding work clears the backoff and Redis errors never fail a task"""
+        content_tasks._record_poll_result("task", found_work=True)
+        mock_redis.delete.assert_called_once_with("poll_backoff:task:idle", "poll_backoff:task:skip")
+        
+        mock_redis.incr.return_value = 40
+        content_tasks._record_poll_result("task", found_work=False)
+        mock_redis.set.assert_called_once_with("poll_backoff:task:skip", 1, ex=content_tasks.POLL_BACKOFF_MAX_SECONDS)
+        
+        mock_redis.exists.side_effect = redis.ConnectionError("down")
+        assert content_tasks._poll_backoff_active("task") is False
+    
+    def test_analyze_content_difficulty(self):
+        """Test difficulty is decided by which keyword group matches more"""
+        assert content_tasks._analyze_content_difficulty(
+            Mock(title="Python Basics", description="A beginner tutorial")
+        ) == 'beginner'
+        assert content_tasks._analyze_content_difficulty(
+            Mock(title="Deep Dive", description="Performance optimization of databases")
+        ) == 'advanced'
+        assert content_tasks._analyze_content_difficulty(
+            Mock(title="Advanced Introduction", description=None)
+        ) == 'intermediate'
+    
+    def test_embedding_tasks_routed_to_embedding_queue(self):
+        """Test tasks are routed to queues that default workers consume"""
+        router = content_tasks.celery_app.amqp.router
+        
+        assert router.route({}, content_tasks.process_content_embedding.name)['queue'].name == "embeddings"
+        assert router.route({}, content_tasks.batch_process_content_embeddings.name)['queue'].name == "embeddings"
+        assert router.route({}, content_tasks.cleanup_failed_uploads.name)['queue'].name == "maintenance"
+        assert router.route({}, content_tasks.generate_content_difficulty_levels.name)['queue'].name == "content"
+        
+        # Workers started without -Q consume every routed queue
+        assert {"content", "embeddings", "maintenance", "recommendations"} <= set(content_tasks.celery_app.amqp.queues)
+    
+    def test_enqueue_content_embeddings_sends_one_group(self):
+        """Test embedding tasks for many items are sent together as a group"""
+        with patch.object(content_tasks, 'group') as mock_group:
+            content_tasks.enqueue_content_embeddings(["content-1", "content-2"])
+        
+        signatures = list(mock_group.call_args.args[0])
+        assert [sig.args for sig in signatures] == [("content-1",), ("content-2",)]
+        assert all(sig.task == content_tasks.process_content_embedding.name for sig in signatures)
+        mock_group.return_value.apply_async.assert_called_once_with()
+        
+        assert content_tasks.enqueue_content_embeddings([]) is None
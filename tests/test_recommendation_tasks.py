@@ -0,0 +1,29 @@
+"""
+Recommendation Task Tests
+Test recommendation processing Celery tasks
+
+Author: HeadStart Development Team
+Created: 2025-09-05
+Purpose: Test background recommendation tasks without a broker or database
+"""
+
+from unittest.mock import patch
+from services.tasks import recommendation_tasks
+
+class TestRecommendationTasks:
+    """Test recommendation processing tasks"""
+    
+    def test_refresh_recommendations_from_feedback_chains_tasks(self):
+        """Test recommendations are regenerated only after preferences are updated"""
+        interaction = {"interaction_type": "like"}
+        
+        with patch.object(recommendation_tasks, 'chain') as mock_chain:
+            recommendation_tasks.refresh_recommendations_from_feedback("user-1", interaction, limit=10)
+        
+        preferences_sig, recommendations_sig = mock_chain.call_args.args
+        assert preferences_sig.task == recommendation_tasks.update_user_preferences_from_feedback.name
+        assert preferences_sig.args == ("user-1", interaction)
+        assert recommendations_sig.task == recommendation_tasks.generate_user_recommendations.name
+        assert recommendations_sig.args == ("user-1", 10)
+        assert recommendations_sig.immutable
+        mock_chain.return_value.apply_async.assert_called_once_with()
@@ -82,7 +82,26 @@ def hello_world():
         assert hasattr(service, 'security_config')
         assert hasattr(service, 'scanner')
         assert hasattr(service, 'analyzer')
-    
+
+    def test_security_service_builds_scanner_lazily(self):
+        """Test scanner and analyzer are only built on first access."""
+        from services.security_integration import SecurityValidationService
+        
+        service = SecurityValidationService()
+        assert 'scanner' not in vars(service)
+        assert 'analyzer' not in vars(service)
+        
+        assert service.scanner is service.scanner
+        assert 'scanner' in vars(service)
+
+    def test_security_service_is_cached(self):
+        """Test the factory returns a process-wide singleton."""
+        service = create_security_validation_service()
+        assert create_security_validation_service() is service
+
+        create_security_validation_service.cache_clear()
+        assert create_security_validation_service() is not service
+
     @pytest.mark.asyncio
     async def test_security_score_calculation(self, security_service):
         """Test security score calculation logic."""